@@ -1,80 +1,167 @@
 """Configuration and state persistence."""
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from pathlib import Path
-from typing import Optional, List
+from typing import Any, Callable, Dict, Hashable, Optional, List, Tuple
 import json
+import os
+import sqlite3
+import time
+
+# Folder existence checks are reused for a short while (the UI may ask on every render)
+FOLDER_CHECK_TTL_S = 30.0
+_FOLDER_CHECK_CACHE: Dict[str, Tuple[float, Hashable, list]] = {}
+
+MAX_RECENT_FOLDERS = 10
+
+# Recent folders are checked concurrently so slow (e.g. network) mounts overlap
+FOLDER_CHECK_WORKERS = 4
 
 
 def get_config_path() -> Path:
-    """Get the path to the config file in user's home directory."""
+    """Get the path to the config database in user's home directory."""
+    return Path.home() / ".pendant_chooser" / "config.sqlite"
+
+
+def _legacy_config_path() -> Path:
+    """Path of the JSON config used by earlier versions."""
     return Path.home() / ".pendant_chooser" / "config.json"
 
 
-def save_last_folder(folder: str) -> None:
-    """Save the last used folder to config and add to recent folders."""
+def _connect() -> sqlite3.Connection:
+    """Open the config database, creating (and migrating into) it on first use."""
     config_path = get_config_path()
     config_path.parent.mkdir(parents=True, exist_ok=True)
+    is_new = not config_path.exists()
 
-    config = {}
-    if config_path.exists():
-        try:
-            config = json.loads(config_path.read_text())
-        except Exception:
-            pass
+    conn = sqlite3.connect(config_path)
+    conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("CREATE TABLE IF NOT EXISTS recent_folders (folder TEXT PRIMARY KEY, ts REAL)")
+    if is_new:
+        _import_legacy_config(conn)
+    return conn
 
-    config["last_folder"] = folder
 
-    # Add to recent folders (keep last 10)
-    recent = config.get("recent_folders", [])
-    if folder in recent:
-        recent.remove(folder)
-    recent.insert(0, folder)
-    config["recent_folders"] = recent[:10]
+def _import_legacy_config(conn: sqlite3.Connection) -> None:
+    """Copy settings from an old config.json into a freshly created config database."""
+    try:
+        legacy = json.loads(_legacy_config_path().read_text())
+    except Exception:
+        return
+    if not isinstance(legacy, dict):
+        return
+
+    recent = legacy.pop("recent_folders", [])
+    now = time.time()
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value)) for key, value in legacy.items()],
+        )
+        # Earlier entries are more recent, so they get later timestamps
+        conn.executemany(
+            "INSERT OR REPLACE INTO recent_folders (folder, ts) VALUES (?, ?)",
+            [(folder, now - i) for i, folder in enumerate(recent) if isinstance(folder, str)],
+        )
+
+
+def _cached_folder_check(name: str, inputs: Hashable, compute: Callable[[], list]) -> list:
+    """Return compute()'s result, reused for FOLDER_CHECK_TTL_S while inputs are unchanged."""
+    now = time.monotonic()
+    hit = _FOLDER_CHECK_CACHE.get(name)
+    if hit is None or hit[1] != inputs or now - hit[0] >= FOLDER_CHECK_TTL_S:
+        hit = (now, inputs, compute())
+        _FOLDER_CHECK_CACHE[name] = hit
+    return list(hit[2])
+
+
+def save_config(updates: Dict[str, Any]) -> None:
+    """Store config values (JSON-encoded), touching only the given keys."""
+    with closing(_connect()) as conn, conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value)) for key, value in updates.items()],
+        )
+
+
+def load_config_value(key: str, default: Any = None) -> Any:
+    """Load a single config value."""
+    try:
+        with closing(_connect()) as conn:
+            row = conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+    except Exception:
+        return default
+
 
-    config_path.write_text(json.dumps(config, indent=2))
+def save_last_folder(folder: str) -> None:
+    """Save the last used folder to config and add to recent folders."""
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)",
+            ("last_folder", json.dumps(folder)),
+        )
+        # Timestamps stay strictly increasing even with a coarse clock
+        conn.execute(
+            "INSERT OR REPLACE INTO recent_folders (folder, ts) VALUES "
+            "(?, MAX(?, (SELECT COALESCE(MAX(ts), 0) + 1e-6 FROM recent_folders)))",
+            (folder, time.time()),
+        )
+        # Keep only the most recent folders
+        conn.execute(
+            "DELETE FROM recent_folders WHERE folder NOT IN "
+            "(SELECT folder FROM recent_folders ORDER BY ts DESC LIMIT ?)",
+            (MAX_RECENT_FOLDERS,),
+        )
 
 
 def load_last_folder() -> Optional[str]:
     """Load the last used folder from config."""
-    config_path = get_config_path()
-    if not config_path.exists():
-        return None
-
-    try:
-        config = json.loads(config_path.read_text())
-        folder = config.get("last_folder")
-        if folder and Path(folder).exists():
-            return folder
-    except Exception:
-        pass
+    folder = load_config_value("last_folder")
+    if isinstance(folder, str) and folder and os.path.isdir(folder):
+        return folder
 
     return None
 
 
 def get_recent_folders() -> List[str]:
     """Get list of recently used folders that still exist."""
-    config_path = get_config_path()
-    if not config_path.exists():
-        return []
-
     try:
-        config = json.loads(config_path.read_text())
-        recent = config.get("recent_folders", [])
-        # Filter to only existing folders
-        return [f for f in recent if Path(f).exists()]
+        with closing(_connect()) as conn:
+            rows = conn.execute(
+                "SELECT folder FROM recent_folders ORDER BY ts DESC LIMIT ?",
+                (MAX_RECENT_FOLDERS,),
+            ).fetchall()
     except Exception:
         return []
 
+    recent = tuple(folder for (folder,) in rows)
+
+    def existing() -> List[str]:
+        with ThreadPoolExecutor(max_workers=FOLDER_CHECK_WORKERS) as pool:
+            return [f for f, ok in zip(recent, pool.map(os.path.isdir, recent)) if ok]
+
+    # Filter to only existing folders; saving a folder changes the list, which
+    # bypasses the cached result
+    return _cached_folder_check("recent", recent, existing)
+
 
 def get_common_folders() -> List[tuple[str, str]]:
     """Get common folder locations (name, path)."""
     home = Path.home()
-    folders = [
-        ("Home", str(home)),
-        ("Desktop", str(home / "Desktop")),
-        ("Documents", str(home / "Documents")),
-        ("Downloads", str(home / "Downloads")),
-        ("Pictures", str(home / "Pictures")),
-    ]
+    subfolders = ["Desktop", "Documents", "Downloads", "Pictures"]
+
+    def existing() -> List[tuple[str, str]]:
+        # One directory listing of home instead of a stat per candidate
+        try:
+            with os.scandir(home) as it:
+                present = {entry.name for entry in it if entry.is_dir()}
+        except OSError:
+            return []
+        return [("Home", str(home))] + [
+            (name, str(home / name)) for name in subfolders if name in present
+        ]
+
     # Only return folders that exist
-    return [(name, path) for name, path in folders if Path(path).exists()]
+    return _cached_folder_check("common", str(home), existing)
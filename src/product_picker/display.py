@@ -1,110 +1,185 @@
 """Data display utilities - leaderboards and match history."""
 
-from typing import Optional
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, TypeVar
 
 import pandas as pd
-from sqlmodel import select
+from sqlalchemy import event
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
 
 from product_picker.database import get_session
 from product_picker.models import Match, Pendant
-from product_picker.rating import conservative_score
 
+# Match outcome code -> label shown in the history table (anything else is a skip)
+WINNER_LABELS = {"L": "LEFT", "R": "RIGHT", "D": "DRAW"}
 
-def get_leaderboard(folder: str, limit: int = 50) -> pd.DataFrame:
+# Display results per (kind, folder, limit), reused while the folder's version
+# is unchanged. Writers bump the version once their changes are committed.
+_DISPLAY_VERSION: Dict[str, int] = defaultdict(int)
+_DISPLAY_CACHE: Dict[Tuple[str, str, int], Tuple[int, Any]] = {}
+
+T = TypeVar("T")
+
+
+def invalidate_display_cache(folder: str, session: Optional[Session] = None) -> None:
+    """
+    Mark cached leaderboards, history and top 3 for a folder as stale.
+
+    With ``session``, this happens when the session next commits, so a read
+    running in the meantime cannot cache pre-commit rows as current.
+    """
+    if session is not None:
+        event.listen(session, "after_commit", lambda _: invalidate_display_cache(folder), once=True)
+        return
+    _DISPLAY_VERSION[folder] += 1
+
+
+def cached_display(kind: str, folder: str, limit: int, compute: Callable[[], T]) -> T:
+    """Return compute()'s result, reused until the folder's display cache is invalidated."""
+    # Read the version before computing: a write committed meanwhile bumps it
+    # again, so the result is never stored under a newer version than it saw
+    version = _DISPLAY_VERSION[folder]
+    hit = _DISPLAY_CACHE.get((kind, folder, limit))
+    if hit is not None and hit[0] == version:
+        return hit[1]
+    value = compute()
+    _DISPLAY_CACHE[(kind, folder, limit)] = (version, value)
+    return value
+
+
+def get_leaderboard(
+    folder: str, limit: int = 50, session: Optional[Session] = None
+) -> pd.DataFrame:
     """
     Generate leaderboard DataFrame sorted by conservative score.
 
     Args:
         folder: Folder path
         limit: Maximum number of rows to return
+        session: Open session to read from; by default a new one is opened
 
     Returns:
         DataFrame with columns: rank, id, file, score(mu-3σ), mu, sigma, games, W, L, D
+        (cached and shared between calls, so not to be modified)
     """
-    with get_session(folder) as session:
-        rows = session.exec(select(Pendant).where(Pendant.folder == folder)).all()
-
-    data = []
-    for p in rows:
-        data.append(
-            {
-                "id": p.id,
-                "file": p.rel_path,
-                "score(mu-3σ)": round(conservative_score(p.mu, p.sigma), 3),
-                "mu": round(p.mu, 3),
-                "sigma": round(p.sigma, 3),
-                "games": p.games,
-                "W": p.wins,
-                "L": p.losses,
-                "D": p.draws,
-            }
+    return cached_display(
+        "leaderboard", folder, limit, lambda: _query_leaderboard(folder, limit, session)
+    )
+
+
+def _query_leaderboard(folder: str, limit: int, session: Optional[Session]) -> pd.DataFrame:
+    """Read the leaderboard for get_leaderboard()."""
+    if session is None:
+        with get_session(folder) as session:
+            return _query_leaderboard(folder, limit, session)
+
+    # Rows come off ix_pendant_folder_score already in leaderboard order, so
+    # SQLite stops after `limit` rows without sorting
+    rows = session.exec(
+        select(
+            Pendant.id,
+            Pendant.rel_path,
+            Pendant.score,
+            Pendant.mu,
+            Pendant.sigma,
+            Pendant.games,
+            Pendant.wins,
+            Pendant.losses,
+            Pendant.draws,
         )
-
-    df = pd.DataFrame(data)
-    if df.empty:
-        return df
-
-    df = df.sort_values(by="score(mu-3σ)", ascending=False).reset_index(drop=True)
+        .where(Pendant.folder == folder)
+        .order_by(Pendant.score.desc(), Pendant.id)
+        .limit(limit)
+    ).all()
+
+    if not rows:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(
+        rows, columns=["id", "file", "score(mu-3σ)", "mu", "sigma", "games", "W", "L", "D"]
+    )
+    df = df.round({"score(mu-3σ)": 3, "mu": 3, "sigma": 3})
     df.insert(0, "rank", range(1, len(df) + 1))
-    return df.head(limit)
+    return df
 
 
-def get_match_history(folder: str, limit: int = 25) -> pd.DataFrame:
+def get_match_history(
+    folder: str, limit: int = 25, session: Optional[Session] = None
+) -> pd.DataFrame:
     """
     Generate match history DataFrame.
 
     Args:
         folder: Folder path
         limit: Maximum number of matches to return
+        session: Open session to read from; by default a new one is opened
 
     Returns:
         DataFrame with columns: t_utc, left, right, winner
+        (cached and shared between calls, so not to be modified)
     """
-    with get_session(folder) as session:
-        matches = session.exec(
-            select(Match).where(Match.folder == folder).order_by(Match.id.desc()).limit(limit)
-        ).all()
-
-        # Map IDs to names for display
-        ids = set()
-        for m in matches:
-            ids.add(m.shown_left_id)
-            ids.add(m.shown_right_id)
-
-        pendants = session.exec(select(Pendant).where(Pendant.folder == folder)).all()
-        name_map = {p.id: p.rel_path for p in pendants if p.id in ids}
-
-    data = []
-    for m in matches:
-        if m.outcome == "L":
-            winner = "LEFT"
-        elif m.outcome == "R":
-            winner = "RIGHT"
-        elif m.outcome == "D":
-            winner = "DRAW"
-        else:
-            winner = "SKIP"
-
-        data.append(
-            {
-                "t_utc": m.created_at_utc,
-                "left": name_map.get(m.shown_left_id, f"id={m.shown_left_id}"),
-                "right": name_map.get(m.shown_right_id, f"id={m.shown_right_id}"),
-                "winner": winner,
-            }
+    return cached_display(
+        "history", folder, limit, lambda: _query_match_history(folder, limit, session)
+    )
+
+
+def _query_match_history(folder: str, limit: int, session: Optional[Session]) -> pd.DataFrame:
+    """Read the match history for get_match_history()."""
+    if session is None:
+        with get_session(folder) as session:
+            return _query_match_history(folder, limit, session)
+
+    left = aliased(Pendant)
+    right = aliased(Pendant)
+    # Resolve file names in the same query; outer joins keep matches whose
+    # pendant row is gone (shown as id=N below)
+    matches = session.exec(
+        select(
+            Match.created_at_utc,
+            Match.shown_left_id,
+            left.rel_path,
+            Match.shown_right_id,
+            right.rel_path,
+            Match.outcome,
         )
-
-    return pd.DataFrame(data)
-
-
-def get_pendant_by_id(folder: str, pendant_id: Optional[int]) -> Optional[Pendant]:
+        .outerjoin(left, left.id == Match.shown_left_id)
+        .outerjoin(right, right.id == Match.shown_right_id)
+        .where(Match.folder == folder)
+        .order_by(Match.id.desc())
+        .limit(limit)
+    ).all()
+
+    df = pd.DataFrame(matches, columns=["t_utc", "left_id", "left", "right_id", "right", "outcome"])
+    df["left"] = df["left"].fillna("id=" + df["left_id"].astype(str))
+    df["right"] = df["right"].fillna("id=" + df["right_id"].astype(str))
+    df["winner"] = df["outcome"].map(WINNER_LABELS).fillna("SKIP")
+    return df[["t_utc", "left", "right", "winner"]]
+
+
+def get_pendant_by_id(
+    folder: str, pendant_id: Optional[int], session: Optional[Session] = None
+) -> Optional[Pendant]:
     """Get a pendant by ID."""
-    if pendant_id is None:
-        return None
+    return get_pendants_by_ids(folder, [pendant_id], session).get(pendant_id)
+
 
-    with get_session(folder) as session:
-        pendant = session.exec(
-            select(Pendant).where(Pendant.folder == folder, Pendant.id == pendant_id)
-        ).first()
+def get_pendants_by_ids(
+    folder: str, pendant_ids: Iterable[Optional[int]], session: Optional[Session] = None
+) -> Dict[int, Pendant]:
+    """Get several pendants with a single query, keyed by ID (missing IDs are left out).
 
-    return pendant
+    Uses ``session`` if given (the pendants stay attached to it), else a new one.
+    """
+    ids = [pid for pid in pendant_ids if pid is not None]
+    if not ids:
+        return {}
+
+    if session is None:
+        with get_session(folder) as session:
+            return get_pendants_by_ids(folder, ids, session)
+
+    pendants = session.exec(
+        select(Pendant).where(Pendant.folder == folder, Pendant.id.in_(ids))
+    ).all()
+    return {p.id: p for p in pendants}
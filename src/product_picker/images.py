@@ -1,21 +1,30 @@
 """Image loading and processing utilities."""
 
 import hashlib
+import os
+import threading
 from pathlib import Path
 
 from PIL import Image, ImageOps
 
 from product_picker.models import Pendant
 
-
 SUPPORTED_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tif", ".tiff"}
 
+# The top-3 thumbnails go to the browser as encoded files named by content hash:
+# an unchanged top 3 keeps the same URLs and stays in the browser cache
+THUMB_MAX_SIDE = 400
+THUMB_FILE_QUALITY = 85
+
 
 def sha256_file(path: Path) -> str:
     """Calculate SHA-256 hash of a file."""
-    h = hashlib.sha256()
     with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+: read loop runs in C
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+        h = hashlib.sha256()
+        for chunk in iter(lambda: f.read(4 * 1024 * 1024), b""):
             h.update(chunk)
     return h.hexdigest()
 
@@ -25,6 +34,49 @@ def pendant_abs_path(p: Pendant) -> Path:
     return Path(p.folder) / p.rel_path
 
 
+def _decode_for_display(path: Path, max_side: int) -> Image.Image:
+    """Decode an image upright in RGB, downscaled to fit within max_side."""
+    img = Image.open(path)
+    if img.mode in ("P", "1"):
+        # Pillow resamples palette and bilevel images with NEAREST; convert
+        # first so the downscale below is anti-aliased
+        has_alpha = img.mode == "P" and "transparency" in img.info
+        img = img.convert("RGBA" if has_alpha else "RGB")
+    # thumbnail() drafts JPEGs to 1/2, 1/4 or 1/8 scale in the DCT domain while
+    # keeping at least reducing_gap times the target size, then resizes in
+    # place; images that already fit are left alone
+    img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS, reducing_gap=2.0)
+    img = ImageOps.exif_transpose(img)  # Handle EXIF orientation
+    return img.convert("RGB")
+
+
+def thumbnail_dir(folder: str) -> Path:
+    """Directory holding a folder's encoded thumbnails (next to its database)."""
+    return Path(folder) / ".pendant_ranker" / "thumbs"
+
+
+def thumbnail_file(p: Pendant, max_side: int = THUMB_MAX_SIDE) -> Path:
+    """
+    Get a WebP thumbnail of a pendant image, encoding it on first use.
+
+    Args:
+        p: Pendant to get the thumbnail for
+        max_side: Maximum dimension (width or height) in pixels
+
+    Returns:
+        Path of the thumbnail file
+    """
+    thumb = thumbnail_dir(p.folder) / f"{p.sha256}_{max_side}.webp"
+    if not thumb.exists():
+        thumb.parent.mkdir(parents=True, exist_ok=True)
+        img = _decode_for_display(pendant_abs_path(p), max_side)
+        # Write under a temporary name so a concurrent reader never sees half a file
+        tmp = thumb.with_name(f"{thumb.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        img.save(tmp, "WEBP", quality=THUMB_FILE_QUALITY)
+        os.replace(tmp, thumb)
+    return thumb
+
+
 def load_image_for_display(p: Pendant, max_side: int = 900) -> Image.Image:
     """
     Load and prepare a pendant image for display.
@@ -36,22 +88,17 @@ def load_image_for_display(p: Pendant, max_side: int = 900) -> Image.Image:
     Returns:
         PIL Image ready for display
     """
-    img = Image.open(pendant_abs_path(p))
-    img = ImageOps.exif_transpose(img)  # Handle EXIF orientation
-    img = img.convert("RGB")
-
-    w, h = img.size
-    scale = min(max_side / max(w, h), 1.0)
-    if scale < 1.0:
-        img = img.resize((int(w * scale), int(h * scale)), Image.Resampling.LANCZOS)
-
-    return img
+    return _decode_for_display(pendant_abs_path(p), max_side)
 
 
 def find_image_files(folder: Path, recursive: bool = True) -> list[Path]:
     """
     Find all supported image files in a folder.
 
+    Hidden files and folders (such as the .pendant_ranker database folder) are
+    skipped. Directory entries come from os.scandir, whose file-type checks
+    reuse what the directory listing returned instead of a stat per entry.
+
     Args:
         folder: Folder to search
         recursive: Whether to search recursively
@@ -59,11 +106,24 @@ def find_image_files(folder: Path, recursive: bool = True) -> list[Path]:
     Returns:
         List of image file paths
     """
-    pattern_iter = folder.rglob("*") if recursive else folder.glob("*")
-
     files = []
-    for fp in pattern_iter:
-        if fp.is_file() and fp.suffix.lower() in SUPPORTED_EXTS:
-            files.append(fp)
+    pending = [str(folder)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            pending.append(entry.path)
+                    elif (
+                        os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTS
+                        and entry.is_file()
+                    ):
+                        files.append(Path(entry.path))
+        except OSError:
+            # Unreadable (or since removed) directory: skip it, like Path.rglob
+            continue
 
     return files
@@ -10,16 +10,78 @@ Key concepts:
 - Cooldown: Prevent immediate repeats of skipped/drawn pairs
 """
 
+import math
 import random
-from math import sqrt, erf
-from typing import Dict, List, Optional, Tuple
+import threading
+from collections import deque
+from functools import lru_cache
+from math import sqrt
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from sqlmodel import Session, select
-from trueskill import Rating
+import numpy as np
+from sqlalchemy import bindparam
+from sqlmodel import Session, func, insert, select
 
 from product_picker.database import get_session
+from product_picker.display import invalidate_display_cache
 from product_picker.models import Match, Pendant
-from product_picker.rating import TS_ENV
+from product_picker.rating import (
+    _DRAW_MARGIN,
+    _INV_SQRT2,
+    _INV_SQRT_2PI,
+    _NUMBA_AVAILABLE,
+    _TAU_SQ,
+    _TWO_BETA_SQ,
+    _rate_1v1_inline,
+    _scalar_cdf,
+    njit,
+)
+
+# Pairs skipped or drawn in this many latest matches are not offered again
+# right away (they may come back later if still highly informative)
+COOLDOWN_MATCHES = 2
+
+# Per-folder pendant arrays, pair repeat counts and latest outcomes, so
+# choose_next_pair only reads the matches recorded since its previous call.
+# Gradio handlers run on worker threads: each entry's "lock" guards reading
+# new rows and folding them in, and _STATE_LOCK guards creating entries.
+_STATE: Dict[str, Dict[str, Any]] = {}
+_STATE_LOCK = threading.Lock()
+
+# Generator for Thompson sampling draws (PCG64), created once per process
+_RNG = np.random.default_rng()
+
+# Hot per-click queries, built once with bound parameters so SQLAlchemy's
+# compiled-statement cache is hit on every call. All return plain row tuples.
+_SEL_PENDANT_RATINGS = select(Pendant.id, Pendant.mu, Pendant.sigma, Pendant.games).where(
+    Pendant.folder == bindparam("folder")
+)
+_SEL_NEW_PENDANT_RATINGS = select(Pendant.id, Pendant.mu, Pendant.sigma, Pendant.games).where(
+    Pendant.folder == bindparam("folder"), Pendant.id > bindparam("since_id")
+)
+_SEL_PAIR_COUNTS = (
+    select(
+        Match.pair_a_id,
+        Match.pair_b_id,
+        func.count().label("n"),
+        func.max(Match.id).label("max_id"),
+    )
+    .where(Match.folder == bindparam("folder"), Match.id > bindparam("since_id"))
+    .group_by(Match.pair_a_id, Match.pair_b_id)
+)
+# Ordering by the integer primary key walks ix_match_folder backwards (it
+# carries the rowid) instead of sorting
+_SEL_RECENT_OUTCOMES = (
+    select(Match.pair_a_id, Match.pair_b_id, Match.outcome)
+    .where(Match.folder == bindparam("folder"))
+    .order_by(Match.id.desc())
+    .limit(bindparam("last_n"))
+)
+_SEL_NEW_MATCHES = (
+    select(Match.id, Match.pair_a_id, Match.pair_b_id, Match.outcome)
+    .where(Match.folder == bindparam("folder"), Match.id > bindparam("since_id"))
+    .order_by(Match.id)
+)
 
 
 def _pair_ids(a: int, b: int) -> Tuple[int, int]:
@@ -28,54 +90,245 @@ def _pair_ids(a: int, b: int) -> Tuple[int, int]:
 
 
 def _pair_repeat_counts(
-    session: Session, folder: str, candidate_ids: List[int]
-) -> Dict[Tuple[int, int], int]:
-    """Count how many times each pair has been compared."""
-    cand = set(candidate_ids)
+    session: Session, folder: str, since_id: int = 0
+) -> Tuple[Dict[Tuple[int, int], int], int]:
+    """Count how many times each pair was compared in matches after ``since_id``.
+
+    Returns:
+        Tuple of (counts keyed by canonical pair, highest match id seen)
+    """
     counts: Dict[Tuple[int, int], int] = {}
+    last_id = since_id
 
-    matches = session.exec(select(Match).where(Match.folder == folder)).all()
-    for m in matches:
-        if m.pair_a_id in cand or m.pair_b_id in cand:
-            key = (m.pair_a_id, m.pair_b_id)
-            counts[key] = counts.get(key, 0) + 1
+    # Let SQLite aggregate: one row per distinct pair instead of one per match
+    rows = session.exec(_SEL_PAIR_COUNTS, params={"folder": folder, "since_id": since_id}).all()
+    for a, b, count, max_id in rows:
+        counts[(a, b)] = count
+        last_id = max(last_id, max_id)
 
-    return counts
+    return counts, last_id
 
 
-def _get_recent_skips_and_draws(
-    session: Session, folder: str, last_n: int = 1
-) -> set[Tuple[int, int]]:
-    """Get pairs that were skipped or drawn in the most recent match(es).
+def _folder_state(session: Session, folder: str) -> Dict[str, Any]:
+    """Get the cached selection state for a folder, creating it if needed.
 
-    We only look at the very last match to prevent immediate repeats,
-    but allow the pair to come back later if it's highly informative.
+    Entries are tied to the engine they were loaded from, so resetting the
+    database (which replaces the folder's engine) discards them.
     """
-    recent_skip_draw = set()
+    engine = session.get_bind()
+    with _STATE_LOCK:
+        state = _STATE.get(folder)
+        if state is None or state["engine"] is not engine:
+            state = _new_folder_state(engine)
+            _STATE[folder] = state
+    return state
+
+
+def _new_folder_state(engine) -> Dict[str, Any]:
+    """Empty selection state for a folder's engine."""
+    return {
+        "engine": engine,
+        "lock": threading.Lock(),
+        "pendants": None,
+        "pendants_added": False,
+        "ratings_version": 0,
+        "last_choice": None,
+        "repeat": None,
+        "recent": deque(maxlen=COOLDOWN_MATCHES),
+        "last_match_id": 0,
+    }
+
+
+def _cached_pendants(session: Session, folder: str) -> Dict[str, Any]:
+    """Get a folder's pendants as parallel arrays, loading only what is missing.
+
+    Pendants added since the arrays were built (flagged by
+    ``invalidate_pair_cache``) are read by id and appended.
 
-    # Get the most recent match only
-    matches = session.exec(
-        select(Match)
-        .where(Match.folder == folder)
-        .order_by(Match.created_at_utc.desc())
-        .limit(last_n)
-    ).all()
+    Returns:
+        Dict with ``ids``, ``mu``, ``sigma`` and ``games`` arrays (database order)
+        and ``pos``, mapping pendant id to its index in those arrays
+    """
+    state = _folder_state(session, folder)
+    with state["lock"]:
+        return _load_pendants(session, folder, state)
+
+
+def _load_pendants(session: Session, folder: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    """Body of ``_cached_pendants``; the caller holds the folder's lock."""
+    arrays = state["pendants"]
+    if arrays is None:
+        rows = session.exec(_SEL_PENDANT_RATINGS, params={"folder": folder}).all()
+        arrays = {"ids": np.empty(0, dtype=np.int64), "pos": {}}
+    elif state["pendants_added"]:
+        since_id = int(arrays["ids"].max()) if len(arrays["ids"]) else 0
+        rows = session.exec(
+            _SEL_NEW_PENDANT_RATINGS, params={"folder": folder, "since_id": since_id}
+        ).all()
+    else:
+        return arrays
+
+    n = len(rows)
+    new = {
+        "ids": np.fromiter((r[0] for r in rows), dtype=np.int64, count=n),
+        "mu": np.fromiter((r[1] for r in rows), dtype=np.float64, count=n),
+        "sigma": np.fromiter((r[2] for r in rows), dtype=np.float64, count=n),
+        "games": np.fromiter((r[3] for r in rows), dtype=np.int64, count=n),
+    }
+    start = len(arrays["ids"])
+    for key, values in new.items():
+        arrays[key] = np.concatenate([arrays[key], values]) if start else values
+    arrays["pos"].update((pid, start + i) for i, pid in enumerate(new["ids"].tolist()))
+
+    state["pendants"] = arrays
+    state["pendants_added"] = False
+    state["ratings_version"] += 1
+    return arrays
+
+
+def _cached_match_stats(
+    session: Session, folder: str
+) -> Tuple[Dict[Tuple[int, int], int], set[Tuple[int, int]]]:
+    """Get pair repeat counts and cooldown pairs for a folder.
+
+    The first call aggregates all matches in SQL; later calls read only the
+    matches added since, in one query, and fold them into both. Matches are
+    folded in from the database rather than from record_match, so uncommitted
+    or rolled-back matches and ones recorded by other sessions are counted
+    exactly when they are visible.
+
+    Returns:
+        Tuple of (repeat counts keyed by canonical pair, pairs skipped or drawn
+        in the last ``COOLDOWN_MATCHES`` matches)
+    """
+    state = _folder_state(session, folder)
+    with state["lock"]:
+        return _load_match_stats(session, folder, state)
+
+
+def _load_match_stats(
+    session: Session, folder: str, state: Dict[str, Any]
+) -> Tuple[Dict[Tuple[int, int], int], set[Tuple[int, int]]]:
+    """Body of ``_cached_match_stats``; the caller holds the folder's lock."""
+    recent = state["recent"]
+    if state["repeat"] is None:
+        state["repeat"], state["last_match_id"] = _pair_repeat_counts(session, folder)
+        rows = session.exec(
+            _SEL_RECENT_OUTCOMES, params={"folder": folder, "last_n": COOLDOWN_MATCHES}
+        ).all()
+        recent.extend(reversed(rows))  # oldest first, like later appends
+    else:
+        repeat = state["repeat"]
+        rows = session.exec(
+            _SEL_NEW_MATCHES, params={"folder": folder, "since_id": state["last_match_id"]}
+        ).all()
+        for match_id, a, b, outcome in rows:
+            repeat[(a, b)] = repeat.get((a, b), 0) + 1
+            recent.append((a, b, outcome))
+            state["last_match_id"] = match_id
+
+    cooldown = {(a, b) for a, b, outcome in recent if outcome in {"S", "D"}}  # Skip or Draw
+    return state["repeat"], cooldown
 
-    for m in matches:
-        if m.outcome in {"S", "D"}:  # Skip or Draw
-            recent_skip_draw.add((m.pair_a_id, m.pair_b_id))
 
-    return recent_skip_draw
+def invalidate_pair_cache(folder: str) -> None:
+    """Note that pendants were added to a folder, so the next selection loads them."""
+    state = _STATE.get(folder)
+    if state is not None:
+        with state["lock"]:
+            state["pendants_added"] = True
 
 
-def _cdf(x: float) -> float:
+def update_cached_ratings(folder: str, pendants: Iterable[Pendant]) -> None:
+    """Copy freshly updated ratings into the folder's cached arrays.
+
+    Call after ``update_ratings`` so the next pair selection sees the new
+    values without reloading every pendant.
+    """
+    state = _STATE.get(folder)
+    if state is None:
+        return
+
+    with state["lock"]:
+        arrays = state["pendants"]
+        if arrays is None:
+            return
+        for p in pendants:
+            i = arrays["pos"].get(p.id)
+            if i is None:
+                state["pendants"] = None
+                return
+            arrays["mu"][i] = p.mu
+            arrays["sigma"][i] = p.sigma
+            arrays["games"][i] = p.games
+        state["ratings_version"] += 1
+
+
+_ERFC_COEFFS = (
+    -0.82215223,
+    1.48851587,
+    -1.13520398,
+    0.27886807,
+    -0.18628806,
+    0.09678418,
+    0.37409196,
+    1.00002368,
+    -1.26551223,
+)
+
+
+def _erfc(x: np.ndarray) -> np.ndarray:
+    """Complementary error function (same approximation as trueskill's backend)."""
+    z = np.abs(x)
+    t = 1.0 / (1.0 + z / 2.0)
+    # Horner evaluation of the Chebyshev fit, innermost coefficient first
+    poly = 0.17087277
+    for coeff in _ERFC_COEFFS:
+        poly = coeff + t * poly
+    r = t * np.exp(-z * z + poly)
+    return np.where(x < 0, 2.0 - r, r)
+
+
+def _cdf(x: np.ndarray) -> np.ndarray:
     """Standard normal CDF."""
-    return 0.5 * (1.0 + erf(x / sqrt(2.0)))
+    return 0.5 * _erfc(-x * _INV_SQRT2)
+
 
+def _pdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal PDF."""
+    return np.exp(-0.5 * x * x) * _INV_SQRT_2PI
 
-def _expected_sigma_reduction(left: Pendant, right: Pendant) -> float:
+
+def _w_win(t: np.ndarray, eps: np.ndarray) -> np.ndarray:
+    """TrueSkill's W function for a decisive outcome (winner's perspective).
+
+    Vectorized form of the decisive branch of rating._rate_1v1_inline.
     """
-    Compute expected reduction in σ (uncertainty) for a single comparison.
+    x = t - eps
+    denom = _cdf(x)
+    safe = denom > 0.0
+    v = np.where(safe, _pdf(x) / np.where(safe, denom, 1.0), -x)
+    return np.clip(v * (v + x), 0.0, 1.0)
+
+
+def _w_draw(t: np.ndarray, eps: np.ndarray) -> np.ndarray:
+    """TrueSkill's W function for a draw (vectorized draw branch of rating._rate_1v1_inline)."""
+    abs_t = np.abs(t)
+    a = eps - abs_t
+    b = -eps - abs_t
+    denom = _cdf(a) - _cdf(b)
+    safe = denom > 0.0
+    denom = np.where(safe, denom, 1.0)
+    v = (_pdf(b) - _pdf(a)) / denom
+    w = v * v + (a * _pdf(a) - b * _pdf(b)) / denom
+    return np.where(safe, np.clip(w, 0.0, 1.0), 1.0)
+
+
+def _expected_sigma_reduction(
+    mu_l: np.ndarray, sigma_l: np.ndarray, mu_r: np.ndarray, sigma_r: np.ndarray
+) -> np.ndarray:
+    """
+    Compute expected reduction in σ (uncertainty) for candidate comparisons.
 
     This is the principled Bayesian active learning objective: select pairs
     that maximize expected information gain (equivalently, minimize expected
@@ -87,52 +340,210 @@ def _expected_sigma_reduction(left: Pendant, right: Pendant) -> float:
     3. Measure σ reduction under each outcome
     4. Take expectation: Σ p(y) × Δσ(y)
 
+    Works element-wise on NumPy arrays (broadcasting like a ufunc). The
+    hypothetical updates use the closed-form 1v1 TrueSkill posterior, which is
+    what ``rate_1vs1()`` computes for two single-player teams.
+
     Returns:
-        Expected reduction in (σ_left + σ_right) from this comparison
+        Expected reduction in (σ_left + σ_right) from each comparison
     """
-    rL = Rating(mu=left.mu, sigma=left.sigma)
-    rR = Rating(mu=right.mu, sigma=right.sigma)
+    var_l = sigma_l * sigma_l
+    var_r = sigma_r * sigma_r
+    delta_mu = mu_l - mu_r
 
     # Approximate outcome probabilities using TrueSkill's generative model
     # Skills → Performances (with noise β) → Outcome
-    delta_mu = rL.mu - rR.mu
-    denom = sqrt(2 * (TS_ENV.beta**2) + rL.sigma**2 + rR.sigma**2)
+    denom_sq = _TWO_BETA_SQ + var_l + var_r
 
     # Probability left wins (ignoring draws)
-    p_left_nd = _cdf(delta_mu / denom)
+    p_left_nd = _cdf(delta_mu / np.sqrt(denom_sq))
 
-    # Draw probability from TrueSkill's match quality
-    # quality_1vs1 returns the probability of a draw given the skill difference
-    p_draw = TS_ENV.quality_1vs1(rL, rR)
+    # Draw probability from TrueSkill's match quality (quality_1vs1)
+    p_draw = np.sqrt(_TWO_BETA_SQ / denom_sq) * np.exp(-0.5 * delta_mu * delta_mu / denom_sq)
 
     # Split non-draw probability between left and right wins
     p_left = p_left_nd * (1.0 - p_draw)
     p_right = (1.0 - p_left_nd) * (1.0 - p_draw)
 
-    # Hypothetical rating updates for each outcome
-    # Left wins
-    newL_w, newR_w = TS_ENV.rate_1vs1(rL, rR, drawn=False)
-    # Right wins
-    newR_l, newL_l = TS_ENV.rate_1vs1(rR, rL, drawn=False)
-    # Draw
-    newL_d, newR_d = TS_ENV.rate_1vs1(rL, rR, drawn=True)
+    # Hypothetical rating updates: the dynamics factor τ is applied first
+    var_l = var_l + _TAU_SQ
+    var_r = var_r + _TAU_SQ
+    c_sq = _TWO_BETA_SQ + var_l + var_r
+    c = np.sqrt(c_sq)
+    t = delta_mu / c
+    eps = _DRAW_MARGIN / c
+
+    def _new_sigma_sum(w: np.ndarray) -> np.ndarray:
+        return np.sqrt(var_l * (1.0 - var_l / c_sq * w)) + np.sqrt(var_r * (1.0 - var_r / c_sq * w))
 
     # Current total uncertainty
-    sigma_sum = left.sigma + right.sigma
+    sigma_sum = sigma_l + sigma_r
 
     # Uncertainty reduction under each outcome
-    delta_w = sigma_sum - (newL_w.sigma + newR_w.sigma)  # Left wins
-    delta_l = sigma_sum - (newL_l.sigma + newR_l.sigma)  # Right wins
-    delta_d = sigma_sum - (newL_d.sigma + newR_d.sigma)  # Draw
+    delta_w = sigma_sum - _new_sigma_sum(_w_win(t, eps))  # Left wins
+    delta_l = sigma_sum - _new_sigma_sum(_w_win(-t, eps))  # Right wins
+    delta_d = sigma_sum - _new_sigma_sum(_w_draw(t, eps))  # Draw
 
     # Expected uncertainty reduction
     return p_left * delta_w + p_right * delta_l + p_draw * delta_d
 
 
+@njit(cache=True, error_model="numpy")
+def _scalar_sigma_reduction(
+    mu_l: float,
+    sigma_l: float,
+    mu_r: float,
+    sigma_r: float,
+    two_beta_sq: float,
+    tau_sq: float,
+    draw_margin: float,
+) -> float:
+    """Scalar version of ``_expected_sigma_reduction`` for the jitted grid search."""
+    var_l = sigma_l * sigma_l
+    var_r = sigma_r * sigma_r
+    delta_mu = mu_l - mu_r
+
+    denom_sq = two_beta_sq + var_l + var_r
+    p_left_nd = _scalar_cdf(delta_mu / sqrt(denom_sq))
+    p_draw = sqrt(two_beta_sq / denom_sq) * math.exp(-0.5 * delta_mu * delta_mu / denom_sq)
+    p_left = p_left_nd * (1.0 - p_draw)
+    p_right = (1.0 - p_left_nd) * (1.0 - p_draw)
+
+    sigma_sum = sigma_l + sigma_r
+
+    # Posterior σ sums from the same 1v1 update that update_ratings applies
+    _, new_l, _, new_r = _rate_1v1_inline(
+        mu_l, sigma_l, mu_r, sigma_r, False, two_beta_sq, tau_sq, draw_margin
+    )
+    expected = p_left * (sigma_sum - new_l - new_r)
+    _, new_r, _, new_l = _rate_1v1_inline(
+        mu_r, sigma_r, mu_l, sigma_l, False, two_beta_sq, tau_sq, draw_margin
+    )
+    expected += p_right * (sigma_sum - new_l - new_r)
+    _, new_l, _, new_r = _rate_1v1_inline(
+        mu_l, sigma_l, mu_r, sigma_r, True, two_beta_sq, tau_sq, draw_margin
+    )
+    expected += p_draw * (sigma_sum - new_l - new_r)
+    return expected
+
+
+@njit(cache=True, error_model="numpy")
+def _scalar_reduction_bound(
+    sigma_l: float, sigma_r: float, two_beta_sq: float, tau_sq: float
+) -> float:
+    """Upper bound on ``_scalar_sigma_reduction`` for any μ (cheap: no exp/erfc).
+
+    Each outcome's W factor is at most 1, which gives the smallest posterior σ,
+    and the expectation over outcomes cannot exceed its largest term.
+    """
+    var_l = sigma_l * sigma_l + tau_sq
+    var_r = sigma_r * sigma_r + tau_sq
+    c_sq = two_beta_sq + var_l + var_r
+    min_sum = sqrt(var_l * (1.0 - var_l / c_sq)) + sqrt(var_r * (1.0 - var_r / c_sq))
+    return sigma_l + sigma_r - min_sum
+
+
+@njit(cache=True, boundscheck=False, error_model="numpy")
+def _best_candidate(
+    mu: np.ndarray,
+    sigma: np.ndarray,
+    ia: np.ndarray,
+    ib: np.ndarray,
+    repeat: np.ndarray,
+    blocked: np.ndarray,
+    two_beta_sq: float,
+    tau_sq: float,
+    draw_margin: float,
+) -> int:
+    """Find the best-scoring unblocked candidate pair in a single pass.
+
+    Scores match the vectorized path (EΔσ minus 0.5 per repeat) and ties go to
+    the first candidate, like ``np.argmax``. Candidates whose EΔσ upper bound
+    cannot beat the best score so far are skipped; as the EΔσ grid is ordered
+    by σ, most low-σ pairs are pruned this way.
+
+    Returns:
+        Index into the candidate arrays, or -1 if every candidate is blocked
+    """
+    best_k = -1
+    best = -np.inf
+    for k in range(ia.shape[0]):
+        if blocked[k]:
+            continue
+        i = ia[k]
+        j = ib[k]
+        penalty = 0.5 * repeat[k]
+        # Branch and bound: skip the full evaluation if even the bound can't win
+        if _scalar_reduction_bound(sigma[i], sigma[j], two_beta_sq, tau_sq) - penalty <= best:
+            continue
+        score = _scalar_sigma_reduction(
+            mu[i], sigma[i], mu[j], sigma[j], two_beta_sq, tau_sq, draw_margin
+        )
+        score -= penalty
+        if score > best:
+            best, best_k = score, k
+    return best_k
+
+
+@lru_cache(maxsize=8)
+def _grid_candidates(max_left: int, max_right: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions (i, j) with i < max_left and i < j < max_right, each unordered pair once."""
+    ia, ib = np.triu_indices(max_right, k=1)
+    keep = ia < max_left
+    ia, ib = ia[keep], ib[keep]
+    # Shared between calls, so make sure nobody writes to them
+    ia.flags.writeable = False
+    ib.flags.writeable = False
+    return ia, ib
+
+
+if _NUMBA_AVAILABLE:
+    # Compile (or load from numba's on-disk cache) at import instead of on the
+    # first click, for both argument types choose_next_pair passes: writable
+    # index arrays (Thompson sampling) and read-only ones (the EΔσ grid, which
+    # numba types separately)
+    for _ia, _ib in (
+        (np.zeros(1, dtype=np.intp), np.ones(1, dtype=np.intp)),
+        _grid_candidates(1, 2),
+    ):
+        _best_candidate(
+            np.zeros(2),
+            np.ones(2),
+            _ia,
+            _ib,
+            np.zeros(1),
+            np.zeros(1, dtype=bool),
+            1.0,
+            0.0,
+            0.0,
+        )
+    del _ia, _ib
+
+
+def _pair_keys(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Encode id pairs as single int64 keys, smaller id in the high bits (canonical order)."""
+    return (np.minimum(a, b) << 32) | np.maximum(a, b)
+
+
+def _lookup_pair_counts(keys: np.ndarray, counts: Dict[Tuple[int, int], int]) -> np.ndarray:
+    """Repeat count for each pair key (0 for pairs never compared)."""
+    if not counts:
+        return np.zeros(len(keys), dtype=np.float64)
+    count_keys = np.fromiter((a << 32 | b for a, b in counts), dtype=np.int64, count=len(counts))
+    count_vals = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+    order = np.argsort(count_keys)
+    count_keys = count_keys[order]
+    count_vals = count_vals[order]
+
+    pos = np.minimum(np.searchsorted(count_keys, keys), len(count_keys) - 1)
+    return np.where(count_keys[pos] == keys, count_vals[pos], 0.0)
+
+
 def choose_next_pair(
     folder: str,
     policy: str = "hybrid",
     ts_prob: float = 0.25,
+    session: Optional[Session] = None,
 ) -> Optional[Tuple[int, int]]:
     """
     Select the next pendant pair using hybrid EΔσ + Thompson Sampling.
@@ -147,97 +558,138 @@ def choose_next_pair(
        each pendant's posterior and consider adjacent pairs in the sampled order.
        This naturally surfaces uncertain items and prevents greedy loops.
 
+    3. **Cold start**: While some pendants have never been compared, a random
+       pair of them is returned directly without scoring.
+
     **Why Hybrid?**
     - Pure EΔσ can get stuck refining the same near-ties
     - Pure Thompson is optimized for "find the best" not "full ranking"
     - Hybrid ensures variety while prioritizing informative comparisons
 
     **TrueSkill Integration**:
-    - Uses quality_1vs1() for draw probability estimation
-    - Uses rate_1vs1() for hypothetical updates
+    - Uses the quality_1vs1() formula for draw probability estimation
+    - Uses the closed-form rate_1vs1() posterior for hypothetical updates
     - Respects the Bayesian generative model (skills → performances → outcomes)
 
     Args:
         folder: Folder path containing pendants
         policy: "hybrid" (default), "edelta", or "thompson"
         ts_prob: Probability of taking a Thompson sampling step (default 0.25)
+        session: Open session to read from; by default a new one is opened.
+            Should not hold uncommitted matches, as they would be cached.
 
     Returns:
         Tuple of (left_id, right_id) or None if < 2 pendants
     """
-    with get_session(folder) as session:
-        pendants = session.exec(select(Pendant).where(Pendant.folder == folder)).all()
-
-    if len(pendants) < 2:
+    if session is None:
+        # One session (one connection checkout) for all reads
+        with get_session(folder) as session:
+            return choose_next_pair(folder, policy, ts_prob, session)
+
+    state = _folder_state(session, folder)
+    # Held throughout so another thread can't change the arrays or counts mid-selection
+    with state["lock"]:
+        pendants = _load_pendants(session, folder, state)
+        # Repeat counts and recent skip/draw pairs
+        counts, recent_skip_draw = _load_match_stats(session, folder, state)
+
+        # Asking again with nothing changed (e.g. reloading the folder or a UI
+        # re-render) returns the pair already chosen for this state
+        key = (policy, ts_prob, state["last_match_id"], state["ratings_version"])
+        if state["last_choice"] is not None and state["last_choice"][0] == key:
+            return state["last_choice"][1]
+
+        pair = _select_pair(pendants, counts, recent_skip_draw, policy, ts_prob)
+        state["last_choice"] = (key, pair)
+        return pair
+
+
+def _select_pair(
+    pendants: Dict[str, Any],
+    counts: Dict[Tuple[int, int], int],
+    recent_skip_draw: set[Tuple[int, int]],
+    policy: str,
+    ts_prob: float,
+) -> Optional[Tuple[int, int]]:
+    """Pick a pair from the cached ratings (see ``choose_next_pair``)."""
+    n = len(pendants["ids"])
+    if n < 2:
         return None
 
-    # Build lookup dict for fast access
-    pendant_by_id: Dict[int, Pendant] = {p.id: p for p in pendants if p.id is not None}
-
     # Sort pendants by uncertainty (high σ first)
-    pendants_sorted = sorted(pendants, key=lambda p: p.sigma, reverse=True)
-
-    # Get repeat counts and recent skip/draw pairs
-    all_ids = [p.id for p in pendants if p.id is not None]
-    with get_session(folder) as session:
-        counts = _pair_repeat_counts(session, folder, all_ids)
-        recent_skip_draw = _get_recent_skips_and_draws(session, folder, last_n=2)
-
-    # Generate candidate pairs based on policy
+    order = np.argsort(-pendants["sigma"], kind="stable")
+    ids = pendants["ids"][order]
+    mu = pendants["mu"][order]
+    sigma = pendants["sigma"][order]
+    games = pendants["games"][order]
+    all_ids = ids.tolist()
+
+    # Cold start: while pendants remain that were never compared, pair them up
+    # directly. They share the highest σ, so EΔσ would pick among them anyway.
+    if policy != "thompson":
+        cold = np.flatnonzero(games == 0).tolist()
+        cold_pair: Optional[Tuple[int, int]] = None
+        if len(cold) >= 2:
+            i, j = random.sample(cold, 2)
+            cold_pair = _pair_ids(all_ids[i], all_ids[j])
+        elif len(cold) == 1:
+            # Last unplayed pendant: pair it with the least-played one
+            others = games.copy()
+            others[cold[0]] = np.iinfo(others.dtype).max
+            cold_pair = _pair_ids(all_ids[cold[0]], all_ids[int(np.argmin(others))])
+        if cold_pair is not None and cold_pair not in recent_skip_draw:
+            return cold_pair
+
+    # Generate candidate pairs based on policy, as flat arrays of positions
+    # into the arrays above
     if policy == "thompson" or (policy == "hybrid" and random.random() < ts_prob):
         # Thompson Sampling: sample skill from posterior for each pendant
         # High-σ items fluctuate more, naturally surfacing uncertain items
-        samples = {p.id: random.gauss(p.mu, p.sigma) for p in pendants if p.id is not None}
-        sorted_ids = sorted(samples.keys(), key=lambda x: samples[x], reverse=True)
+        samples = _RNG.standard_normal(n) * sigma + mu
+        sampled = np.argsort(-samples)
 
         # Consider adjacent pairs in sampled order (close in sampled skill)
-        candidate_pairs = [
-            _pair_ids(sorted_ids[i], sorted_ids[i + 1]) for i in range(len(sorted_ids) - 1)
-        ]
+        ia = sampled[:-1]
+        ib = sampled[1:]
     else:
         # EΔσ: evaluate pairs among high-uncertainty pendants
-        max_left = min(50, len(pendants_sorted))
-        max_right = min(150, len(pendants_sorted))
-        candidate_pairs = []
-        for i in range(max_left):
-            for j in range(i + 1, max_right):
-                a_id = pendants_sorted[i].id
-                b_id = pendants_sorted[j].id
-                if a_id is not None and b_id is not None:
-                    candidate_pairs.append(_pair_ids(a_id, b_id))
-
-    # Score each candidate pair
-    best_pair: Optional[Tuple[int, int]] = None
-    best_score = float("-inf")
-
-    for a, b in candidate_pairs:
-        # Skip recently skipped/drawn pairs (cooldown)
-        if (a, b) in recent_skip_draw:
-            continue
-
-        # Retrieve pendant objects
-        left = pendant_by_id.get(a)
-        right = pendant_by_id.get(b)
-        if left is None or right is None:
-            continue
-
-        # Compute expected uncertainty reduction (EΔσ)
-        delta_sigma = _expected_sigma_reduction(left, right)
-
-        # Light penalty for repeated comparisons to encourage coverage
-        repeat_penalty = counts.get((a, b), 0)
-        score = delta_sigma - 0.5 * repeat_penalty
+        max_left = min(50, n)
+        max_right = min(150, n)
+        ia, ib = _grid_candidates(max_left, max_right)
+
+    # Light penalty for repeated comparisons; recently skipped/drawn pairs
+    # are on cooldown
+    keys = _pair_keys(ids[ia], ids[ib])
+    repeat = _lookup_pair_counts(keys, counts)
+    blocked = np.isin(keys, [a << 32 | b for a, b in recent_skip_draw])
+
+    if _NUMBA_AVAILABLE:
+        # Compiled single pass over the candidates, without the temporaries below
+        best = _best_candidate(
+            mu,
+            sigma,
+            ia,
+            ib,
+            repeat,
+            blocked,
+            _TWO_BETA_SQ,
+            _TAU_SQ,
+            _DRAW_MARGIN,
+        )
+    else:
+        # Score all candidates at once
+        score = _expected_sigma_reduction(mu[ia], sigma[ia], mu[ib], sigma[ib]) - 0.5 * repeat
+        score = np.where(blocked, -np.inf, score)
+        best = int(np.argmax(score)) if score.size and np.isfinite(score.max()) else -1
 
-        if score > best_score:
-            best_score = score
-            best_pair = (a, b)
+    best_pair: Optional[Tuple[int, int]] = None
+    if best >= 0:
+        best_pair = _pair_ids(all_ids[ia[best]], all_ids[ib[best]])
 
     # Fallback: random pair if nothing viable
-    if best_pair is None:
-        ids = list(pendant_by_id.keys())
-        if len(ids) >= 2:
-            a, b = random.sample(ids, 2)
-            best_pair = _pair_ids(a, b)
+    if best_pair is None and n >= 2:
+        a, b = random.sample(all_ids, 2)
+        best_pair = _pair_ids(a, b)
 
     return best_pair
 
@@ -254,4 +706,34 @@ def record_match(session: Session, folder: str, left_id: int, right_id: int, out
         outcome=outcome,
     )
     session.add(m)
+    invalidate_display_cache(folder, session)
     return m
+
+
+def record_matches(session: Session, folder: str, entries: List[Tuple[int, int, str]]) -> None:
+    """
+    Record several matches with a single multi-row INSERT.
+
+    Args:
+        session: Open session; the caller commits
+        folder: Folder path
+        entries: (left_id, right_id, outcome) per match, in the order they were played
+    """
+    if not entries:
+        return
+
+    rows = []
+    for left_id, right_id, outcome in entries:
+        pa, pb = _pair_ids(left_id, right_id)
+        rows.append(
+            {
+                "folder": folder,
+                "shown_left_id": left_id,
+                "shown_right_id": right_id,
+                "pair_a_id": pa,
+                "pair_b_id": pb,
+                "outcome": outcome,
+            }
+        )
+    session.exec(insert(Match), params=rows)
+    invalidate_display_cache(folder, session)
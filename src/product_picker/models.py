@@ -5,21 +5,39 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlmodel import Field, SQLModel
+from sqlalchemy import Column, Computed, Float
+from sqlmodel import Field, Index, SQLModel
+
+
+def utc_now_iso() -> str:
+    """Current UTC time as an ISO-8601 string (timestamp column format)."""
+    return datetime.now(timezone.utc).isoformat()
 
 
 class Pendant(SQLModel, table=True):
     """Represents a pendant image with TrueSkill ratings."""
 
+    # Serves the leaderboard (folder filter, best score first) as an index scan
+    __table_args__ = (Index("ix_pendant_folder_score", "folder", Column("score").desc()),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     folder: str = Field(index=True)  # absolute folder path
     rel_path: str = Field(index=True)  # relative to folder
     sha256: str = Field(index=True)  # content hash for de-dup
-    created_at_utc: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at_utc: str = Field(default_factory=utc_now_iso)
+
+    # File size and modification time when last hashed, so rescans can skip
+    # unchanged files (None for rows from before these were recorded)
+    file_size: Optional[int] = None
+    file_mtime_ns: Optional[int] = None
 
     # TrueSkill parameters
     mu: float = 25.0
     sigma: float = 25.0 / 3.0
+    # Conservative score (rating.conservative_score), computed by SQLite on read
+    score: Optional[float] = Field(
+        default=None, sa_column=Column(Float, Computed("mu - 3.0 * sigma", persisted=False))
+    )
 
     # Simple counters
     games: int = 0
@@ -31,6 +49,11 @@ class Pendant(SQLModel, table=True):
 class Match(SQLModel, table=True):
     """Represents a single comparison between two pendants."""
 
+    # Covers the per-folder repeat-count aggregation (folder filter + GROUP BY pair).
+    # Ordering by id within a folder needs no extra index: SQLite appends the
+    # rowid to ix_match_folder.
+    __table_args__ = (Index("ix_match_folder_pair", "folder", "pair_a_id", "pair_b_id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     folder: str = Field(index=True)
 
@@ -44,4 +67,4 @@ class Match(SQLModel, table=True):
     # "L" | "R" | "D" | "S" (left/right/draw/skip)
     outcome: str = Field(index=True)
 
-    created_at_utc: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at_utc: str = Field(default_factory=utc_now_iso)
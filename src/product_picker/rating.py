@@ -1,14 +1,38 @@
 """TrueSkill rating system logic."""
 
+import math
+from typing import Tuple
+
 import trueskill
 
 from product_picker.models import Pendant
 
+try:
+    from numba import njit
+
+    _NUMBA_AVAILABLE = True
+except ImportError:  # optional speed-up (the "fast" extra)
+    _NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that leaves the function as plain Python."""
+        return lambda fn: fn
+
 
 # TrueSkill environment configuration
 # draw_probability=0.10 means 10% chance of draws in the model
 TS_ENV = trueskill.TrueSkill(draw_probability=0.10)
 
+# Draw margin of a 1v1 match under TS_ENV (trueskill's calc_draw_margin, which
+# inverts the normal CDF, so it is evaluated once)
+_DRAW_MARGIN = trueskill.calc_draw_margin(TS_ENV.draw_probability, 2, env=TS_ENV)
+# Performance noise of both players (2β²) and per-match dynamics variance (τ²)
+_TWO_BETA_SQ = 2.0 * TS_ENV.beta * TS_ENV.beta
+_TAU_SQ = TS_ENV.tau * TS_ENV.tau
+
+_INV_SQRT2 = 1.0 / math.sqrt(2.0)
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
 
 def conservative_score(mu: float, sigma: float) -> float:
     """
@@ -16,10 +40,84 @@ def conservative_score(mu: float, sigma: float) -> float:
 
     This represents a 99.7% confidence lower bound on the true skill.
     Used to prevent barely-compared items from floating to the top.
+    Also works element-wise on NumPy arrays and on SQL column expressions.
+    Pendant.score is the same expression as a generated column.
     """
     return mu - 3.0 * sigma
 
 
+@njit(cache=True, error_model="numpy")
+def _scalar_cdf(x: float) -> float:
+    """Standard normal CDF of a scalar."""
+    return 0.5 * math.erfc(-x * _INV_SQRT2)
+
+
+@njit(cache=True, error_model="numpy")
+def _scalar_pdf(x: float) -> float:
+    """Standard normal PDF of a scalar."""
+    return math.exp(-0.5 * x * x) * _INV_SQRT_2PI
+
+
+@njit(cache=True, error_model="numpy")
+def _rate_1v1_inline(
+    mu_l: float,
+    sigma_l: float,
+    mu_r: float,
+    sigma_r: float,
+    drawn: bool,
+    two_beta_sq: float,
+    tau_sq: float,
+    draw_margin: float,
+) -> Tuple[float, float, float, float]:
+    """
+    Closed-form TrueSkill update for a 1v1 match that the left player won (or drew).
+
+    Gives the same result as TS_ENV.rate_1vs1() (with _TWO_BETA_SQ, _TAU_SQ and
+    _DRAW_MARGIN) without building Rating objects or running the generic
+    factor graph. Pair selection scores its hypothetical outcomes with it too.
+
+    Returns:
+        (mu_l, sigma_l, mu_r, sigma_r) after the match
+    """
+    # The dynamics factor τ is applied before the match
+    var_l = sigma_l * sigma_l + tau_sq
+    var_r = sigma_r * sigma_r + tau_sq
+    c_sq = two_beta_sq + var_l + var_r
+    c = math.sqrt(c_sq)
+    t = (mu_l - mu_r) / c
+    eps = draw_margin / c
+
+    if drawn:
+        a = eps - abs(t)
+        b = -eps - abs(t)
+        denom = _scalar_cdf(a) - _scalar_cdf(b)
+        if denom > 0.0:
+            v = (_scalar_pdf(b) - _scalar_pdf(a)) / denom
+            w = v * v + (a * _scalar_pdf(a) - b * _scalar_pdf(b)) / denom
+        else:
+            v, w = a, 1.0
+        v = -v if t < 0 else v
+    else:
+        x = t - eps
+        denom = _scalar_cdf(x)
+        v = _scalar_pdf(x) / denom if denom > 0.0 else -x
+        w = v * (v + x)
+    w = min(max(w, 0.0), 1.0)
+
+    return (
+        mu_l + var_l / c * v,
+        math.sqrt(var_l * (1.0 - var_l / c_sq * w)),
+        mu_r - var_r / c * v,
+        math.sqrt(var_r * (1.0 - var_r / c_sq * w)),
+    )
+
+
+if _NUMBA_AVAILABLE:
+    # Compile (or load from numba's on-disk cache) at import instead of on the
+    # first rated click
+    _rate_1v1_inline(25.0, 1.0, 25.0, 1.0, False, _TWO_BETA_SQ, _TAU_SQ, _DRAW_MARGIN)
+
+
 def update_ratings(left: Pendant, right: Pendant, outcome: str) -> None:
     """
     Update TrueSkill ratings for two pendants based on match outcome.
@@ -32,23 +130,24 @@ def update_ratings(left: Pendant, right: Pendant, outcome: str) -> None:
     if outcome not in {"L", "R", "D"}:
         return
 
-    rL = TS_ENV.Rating(mu=left.mu, sigma=left.sigma)
-    rR = TS_ENV.Rating(mu=right.mu, sigma=right.sigma)
-
     if outcome == "L":
-        newL, newR = TS_ENV.rate_1vs1(rL, rR, drawn=False)
+        left.mu, left.sigma, right.mu, right.sigma = _rate_1v1_inline(
+            left.mu, left.sigma, right.mu, right.sigma, False, _TWO_BETA_SQ, _TAU_SQ, _DRAW_MARGIN
+        )
         left.wins += 1
         right.losses += 1
     elif outcome == "R":
-        newR, newL = TS_ENV.rate_1vs1(rR, rL, drawn=False)
+        right.mu, right.sigma, left.mu, left.sigma = _rate_1v1_inline(
+            right.mu, right.sigma, left.mu, left.sigma, False, _TWO_BETA_SQ, _TAU_SQ, _DRAW_MARGIN
+        )
         left.losses += 1
         right.wins += 1
     else:  # draw
-        newL, newR = TS_ENV.rate_1vs1(rL, rR, drawn=True)
+        left.mu, left.sigma, right.mu, right.sigma = _rate_1v1_inline(
+            left.mu, left.sigma, right.mu, right.sigma, True, _TWO_BETA_SQ, _TAU_SQ, _DRAW_MARGIN
+        )
         left.draws += 1
         right.draws += 1
 
-    left.mu, left.sigma = float(newL.mu), float(newL.sigma)
-    right.mu, right.sigma = float(newR.mu), float(newR.sigma)
     left.games += 1
     right.games += 1
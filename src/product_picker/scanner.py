@@ -1,14 +1,30 @@
 """Scanning folders and managing pendant database."""
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
-from sqlmodel import select
+from sqlmodel import insert, select, update
 
 from product_picker.database import get_session
+from product_picker.display import invalidate_display_cache
 from product_picker.images import find_image_files, sha256_file
+from product_picker.matching import invalidate_pair_cache
 from product_picker.models import Pendant
 
+# hashlib releases the GIL while reading and hashing, so threads overlap both;
+# a few per core keep an SSD's queue busy
+HASH_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def _try_sha256(path: Path) -> Optional[str]:
+    """Hash a file, returning None if it cannot be read."""
+    try:
+        return sha256_file(path)
+    except Exception:
+        return None
+
 
 def scan_folder(folder: str, recursive: bool = True) -> Dict[str, int]:
     """
@@ -27,37 +43,82 @@ def scan_folder(folder: str, recursive: bool = True) -> Dict[str, int]:
 
     files = find_image_files(folder_p, recursive=recursive)
 
-    added = 0
-    skipped = 0
-
     with get_session(str(folder_p)) as session:
-        # Get existing hashes for this folder
-        existing = session.exec(select(Pendant.sha256).where(Pendant.folder == str(folder_p))).all()
-        existing_set = set(existing)
+        # Existing pendants: hashes for de-dup, file stats to skip re-hashing
+        known = session.exec(
+            select(
+                Pendant.id,
+                Pendant.rel_path,
+                Pendant.sha256,
+                Pendant.file_size,
+                Pendant.file_mtime_ns,
+            ).where(Pendant.folder == str(folder_p))
+        ).all()
+    existing_set = {sha for _, _, sha, _, _ in known}
+    by_path = {rel: (pid, sha, (size, mtime)) for pid, rel, sha, size, mtime in known}
 
+    skipped = 0
+    to_hash = []
+    # Hash only new or changed files, in parallel and without holding a
+    # connection; hashing starts while the remaining files are still checked
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
         for fp in files:
+            rel = str(fp.relative_to(folder_p))
             try:
-                sha = sha256_file(fp)
-            except Exception:
+                st = fp.stat()
+            except OSError:
                 skipped += 1
                 continue
-
-            if sha in existing_set:
-                skipped += 1
+            stat_key = (st.st_size, st.st_mtime_ns)
+            if rel in by_path and by_path[rel][2] == stat_key:
+                skipped += 1  # unchanged since it was hashed
                 continue
+            to_hash.append((fp, rel, stat_key, pool.submit(_try_sha256, fp)))
 
-            rel = str(fp.relative_to(folder_p))
-            p = Pendant(
-                folder=str(folder_p),
-                rel_path=rel,
-                sha256=sha,
-                mu=25.0,
-                sigma=25.0 / 3.0,
-            )
-            session.add(p)
-            existing_set.add(sha)
-            added += 1
-
-        session.commit()
+        hashes = [future.result() for _, _, _, future in to_hash]
+
+    new_rows = []
+    stat_updates = []
+    for (_, rel, (size, mtime), _), sha in zip(to_hash, hashes):
+        if sha is None:
+            skipped += 1
+            continue
+
+        if rel in by_path and by_path[rel][1] == sha:
+            # Same content as recorded (e.g. touched, or hashed before stats
+            # were kept): remember its stats for the next scan
+            stat_updates.append({"id": by_path[rel][0], "file_size": size, "file_mtime_ns": mtime})
+
+        if sha in existing_set:
+            skipped += 1
+            continue
+
+        new_rows.append(
+            {
+                "folder": str(folder_p),
+                "rel_path": rel,
+                "sha256": sha,
+                "file_size": size,
+                "file_mtime_ns": mtime,
+                "mu": 25.0,
+                "sigma": 25.0 / 3.0,
+            }
+        )
+        existing_set.add(sha)
+
+    if new_rows or stat_updates:
+        with get_session(str(folder_p)) as session:
+            # One executemany INSERT instead of an ORM object per new pendant
+            if new_rows:
+                session.exec(insert(Pendant), params=new_rows)
+            if stat_updates:
+                session.exec(update(Pendant), params=stat_updates)
+            session.commit()
+
+    added = len(new_rows)
+
+    if added:
+        invalidate_pair_cache(str(folder_p))
+        invalidate_display_cache(str(folder_p))
 
     return {"found": len(files), "added": added, "skipped": skipped}
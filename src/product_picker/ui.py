@@ -1,33 +1,58 @@
 """Gradio UI for pendant comparison."""
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Optional, Tuple
 
 import gradio as gr
 import pandas as pd
 from PIL import Image
+from sqlmodel import Session
 
 from product_picker.config import load_last_folder, save_last_folder
 from product_picker.database import get_session, reset_database
-from product_picker.display import get_leaderboard, get_match_history, get_pendant_by_id
-from product_picker.images import load_image_for_display
-from product_picker.matching import choose_next_pair, record_match
+from product_picker.display import (
+    cached_display,
+    get_leaderboard,
+    get_match_history,
+    get_pendants_by_ids,
+    invalidate_display_cache,
+)
+from product_picker.images import (
+    load_image_for_display,
+    pendant_abs_path,
+    thumbnail_dir,
+    thumbnail_file,
+)
+from product_picker.matching import choose_next_pair, record_match, update_cached_ratings
+from product_picker.models import Pendant
 from product_picker.rating import conservative_score, update_ratings
 from product_picker.scanner import scan_folder
 
+# Decodes a pair's images (and the top-3 thumbnails) side by side; PIL releases
+# the GIL while decoding
+DECODE_WORKERS = 4
+_DECODE_POOL = ThreadPoolExecutor(max_workers=DECODE_WORKERS, thread_name_prefix="decode")
 
-def render_pair(
-    folder: str, left_id: int, right_id: int
-) -> Tuple[Image.Image, Image.Image, str, str]:
-    """Render a pair of pendant images with their info."""
-    left = get_pendant_by_id(folder, left_id)
-    right = get_pendant_by_id(folder, right_id)
+# Thumbnail directories already registered as Gradio static paths
+_SERVED_THUMB_DIRS: set = set()
 
-    if left is None or right is None:
-        raise ValueError("Pendant not found")
 
+def serve_thumbnails(folder: str) -> None:
+    """Let Gradio serve a folder's thumbnail files in place (stable URLs, no cache copy)."""
+    thumbs = thumbnail_dir(folder)
+    if thumbs not in _SERVED_THUMB_DIRS:
+        gr.set_static_paths([thumbs])
+        _SERVED_THUMB_DIRS.add(thumbs)
+
+
+def render_pendants(left: Pendant, right: Pendant) -> Tuple[Image.Image, Image.Image, str, str]:
+    """Render an already loaded pair of pendants (images and info)."""
+    # Right image on the pool while this thread decodes the left one
+    right_future = _DECODE_POOL.submit(load_image_for_display, right)
     left_img = load_image_for_display(left)
-    right_img = load_image_for_display(right)
+    right_img = right_future.result()
 
     left_md = (
         f"**LEFT**\n\n"
@@ -50,54 +75,54 @@ def render_pair(
 
 
 def get_top_3_display(
-    folder: str,
-) -> Tuple[Optional[Image.Image], str, Optional[Image.Image], str, Optional[Image.Image], str]:
-    """Get images and info for top 3 pendants."""
-    lb = get_leaderboard(folder, limit=3)
+    folder: str, session: Optional[Session] = None
+) -> Tuple[Optional[str], str, Optional[str], str, Optional[str], str]:
+    """Get thumbnail files and info for top 3 pendants (reading through ``session`` if given)."""
+    return cached_display("top3", folder, 3, lambda: _top_3_display(folder, session))
+
+
+def _top_3_display(
+    folder: str, session: Optional[Session]
+) -> Tuple[Optional[str], str, Optional[str], str, Optional[str], str]:
+    """Render the top 3 for get_top_3_display()."""
+    lb = get_leaderboard(folder, limit=3, session=session)
 
     if lb.empty:
         return None, "_No data yet_", None, "_No data yet_", None, "_No data yet_"
 
+    # The three pendants in one query; rows as plain dicts (no per-cell iloc)
+    rows = lb.head(3).to_dict("records")
+    pendants = get_pendants_by_ids(folder, [row["id"] for row in rows], session)
+
+    # Encode missing thumbnails concurrently; errors surface per row below
+    futures = {
+        pid: _DECODE_POOL.submit(thumbnail_file, pendant)
+        for pid, pendant in pendants.items()
+        if pendant_abs_path(pendant).exists()
+    }
+
     results = []
-    for idx in range(3):
-        if idx < len(lb):
-            pendant_id = lb.iloc[idx]["id"]
-            file_path = lb.iloc[idx]["file"]
-
-            # Load image directly from the leaderboard data
-            try:
-                from pathlib import Path
-
-                img_path = Path(folder) / file_path
-                if not img_path.exists():
-                    results.extend([None, f"_File not found: {file_path}_"])
-                    continue
-
-                from PIL import Image, ImageOps
-
-                img = Image.open(img_path)
-                img = ImageOps.exif_transpose(img)
-                img = img.convert("RGB")
-
-                # Resize if needed
-                w, h = img.size
-                max_side = 400
-                scale = min(max_side / max(w, h), 1.0)
-                if scale < 1.0:
-                    img = img.resize((int(w * scale), int(h * scale)), Image.Resampling.LANCZOS)
-
-                score = lb.iloc[idx]["score(mu-3σ)"]
-                info = (
-                    f"**{file_path}**\n\n"
-                    f"Score: **{score:.2f}**\n"
-                    f"Games: {lb.iloc[idx]['games']} "
-                    f"({lb.iloc[idx]['W']}-{lb.iloc[idx]['D']}-{lb.iloc[idx]['L']})"
-                )
-                results.extend([img, info])
-            except Exception as e:
-                results.extend([None, f"_Error: {str(e)}_"])
-        else:
-            results.extend([None, "_Not enough data_"])
+    for row in rows:
+        file_path = row["file"]
+
+        if row["id"] not in futures:
+            results.extend([None, f"_File not found: {file_path}_"])
+            continue
+
+        try:
+            img = str(futures[row["id"]].result())
+            info = (
+                f"**{file_path}**\n\n"
+                f"Score: **{row['score(mu-3σ)']:.2f}**\n"
+                f"Games: {row['games']} ({row['W']}-{row['D']}-{row['L']})"
+            )
+            results.extend([img, info])
+        except Exception as e:
+            results.extend([None, f"_Error: {str(e)}_"])
+
+    # Fewer than three pendants ranked so far
+    for _ in range(3 - len(rows)):
+        results.extend([None, "_Not enough data_"])
 
     return tuple(results)
 
@@ -195,16 +220,23 @@ def load_folder_and_first_pair(folder):
 
     # Save this folder as the last used
     save_last_folder(folder_abs)
+    serve_thumbnails(folder_abs)
 
     stats = scan_folder(folder_abs, recursive=True)
 
-    lb = get_leaderboard(folder_abs, limit=50)
-    hist = get_match_history(folder_abs, limit=25)
+    # All reads for the first screen through one session
+    with get_session(folder_abs) as session:
+        lb = get_leaderboard(folder_abs, limit=50, session=session)
+        hist = get_match_history(folder_abs, limit=25, session=session)
+
+        # Get top 3
+        top1_img, top1_info, top2_img, top2_info, top3_img, top3_info = get_top_3_display(
+            folder_abs, session
+        )
 
-    # Get top 3
-    top1_img, top1_info, top2_img, top2_info, top3_img, top3_info = get_top_3_display(folder_abs)
+        nxt = choose_next_pair(folder_abs, session=session)
+        first_pendants = get_pendants_by_ids(folder_abs, nxt or (), session)
 
-    nxt = choose_next_pair(folder_abs)
     if nxt is None:
         status = (
             f"Scanned `{folder_abs}` — found {stats['found']}, "
@@ -232,7 +264,9 @@ def load_folder_and_first_pair(folder):
         )
 
     left_id, right_id = nxt
-    left_img, right_img, left_md, right_md = render_pair(folder_abs, left_id, right_id)
+    left_img, right_img, left_md, right_md = render_pendants(
+        first_pendants[left_id], first_pendants[right_id]
+    )
 
     status = (
         f"Scanned `{folder_abs}` — found **{stats['found']}**, "
@@ -260,78 +294,65 @@ def load_folder_and_first_pair(folder):
     )
 
 
-def decide_and_advance(folder: str, left_id: Optional[int], right_id: Optional[int], outcome: str):
-    """Process outcome and advance to next pair."""
-    folder_abs = str(Path(folder).expanduser().resolve())
+def refresh_stats(folder: str, session: Optional[Session] = None):
+    """Leaderboard, match history and top 3 for a folder (refreshed after each decision).
 
-    if left_id is None or right_id is None:
-        top1_img, top1_info, top2_img, top2_info, top3_img, top3_info = get_top_3_display(
-            folder_abs
-        )
-        return (
-            None,
-            None,
-            "No active pair. Load a folder first.",
-            None,
-            None,
-            "",
-            "",
-            get_leaderboard(folder_abs),
-            get_match_history(folder_abs),
-            "",
-            top1_img,
-            top1_info,
-            top2_img,
-            top2_info,
-            top3_img,
-            top3_info,
-        )
+    ``folder`` is the resolved path kept in folder_state.
+    """
+    if not folder:
+        return (pd.DataFrame(), pd.DataFrame()) + (None, "_No data yet_") * 3
 
-    # Update ratings and record match
-    with get_session(folder_abs) as session:
-        left = get_pendant_by_id(folder_abs, left_id)
-        right = get_pendant_by_id(folder_abs, right_id)
+    if session is None:
+        with get_session(folder) as session:
+            return refresh_stats(folder, session)
 
-        if left is None or right is None:
-            top1_img, top1_info, top2_img, top2_info, top3_img, top3_info = get_top_3_display(
-                folder_abs
-            )
-            return (
-                None,
-                None,
-                "Error: Pendant not found",
-                None,
-                None,
-                "",
-                "",
-                get_leaderboard(folder_abs),
-                get_match_history(folder_abs),
-                "",
-                top1_img,
-                top1_info,
-                top2_img,
-                top2_info,
-                top3_img,
-                top3_info,
-            )
+    lb = get_leaderboard(folder, limit=50, session=session)
+    hist = get_match_history(folder, limit=25, session=session)
+    return (lb, hist) + get_top_3_display(folder, session)
 
-        # Record match
-        record_match(session, folder_abs, left_id, right_id, outcome)
 
-        # Update ratings if not skip
-        if outcome in {"L", "R", "D"}:
-            update_ratings(left, right, outcome)
-            session.add(left)
-            session.add(right)
+def decide_and_advance_fast(
+    outcome: str, folder: str, left_id: Optional[int], right_id: Optional[int]
+):
+    """
+    Process outcome and advance to next pair.
+
+    Only the comparison itself is returned; the UI follows up with
+    refresh_stats() so the next pair shows without waiting for the tables.
+    ``folder`` is the resolved path kept in folder_state.
+    """
+    if left_id is None or right_id is None:
+        return None, None, "No active pair. Load a folder first.", None, None, "", "", ""
+
+    # One session for the whole click: the write transaction, then the read
+    # for the next pair through the same connection
+    with get_session(folder) as session:
+        # Update ratings and record match in one transaction (committed on exit)
+        with session.begin():
+            pendants = get_pendants_by_ids(folder, (left_id, right_id), session)
+            left = pendants.get(left_id)
+            right = pendants.get(right_id)
 
-        session.commit()
+            if left is None or right is None:
+                return None, None, "Error: Pendant not found", None, None, "", "", ""
 
-    # Get updated data
-    lb = get_leaderboard(folder_abs, limit=50)
-    hist = get_match_history(folder_abs, limit=25)
+            # Record match
+            record_match(session, folder, left_id, right_id, outcome)
 
-    # Get top 3
-    top1_img, top1_info, top2_img, top2_info, top3_img, top3_info = get_top_3_display(folder_abs)
+            # Update ratings if not skip
+            if outcome in {"L", "R", "D"}:
+                update_ratings(left, right, outcome)
+
+        # Only committed ratings reach the selection cache; a failed commit
+        # raises above and leaves it untouched
+        if outcome in {"L", "R", "D"}:
+            update_cached_ratings(folder, (left, right))
+
+        # Get next pair (committed above, so the match cache only sees it now)
+        # The matching algorithm now checks recent skip/draw history automatically
+        # and applies temporary penalties while still allowing highly informative pairs
+        nxt = choose_next_pair(folder, session=session)
+        next_pendants = get_pendants_by_ids(folder, nxt or (), session)
 
     # Result message
     if outcome == "L":
@@ -343,50 +364,12 @@ def decide_and_advance(folder: str, left_id: Optional[int], right_id: Optional[i
     else:
         last = "Last result: **SKIP**"
 
-    # Get next pair
-    # The matching algorithm now checks recent skip/draw history automatically
-    # and applies temporary penalties while still allowing highly informative pairs
-    nxt = choose_next_pair(folder_abs)
     if nxt is None:
-        return (
-            None,
-            None,
-            "Done (or not enough images).",
-            None,
-            None,
-            "",
-            "",
-            lb,
-            hist,
-            last,
-            top1_img,
-            top1_info,
-            top2_img,
-            top2_info,
-            top3_img,
-            top3_info,
-        )
+        return None, None, "Done (or not enough images).", None, None, "", "", last
 
     nL, nR = nxt
-    left_img, right_img, left_md, right_md = render_pair(folder_abs, nL, nR)
-    return (
-        nL,
-        nR,
-        "Showing next comparison.",
-        left_img,
-        right_img,
-        left_md,
-        right_md,
-        lb,
-        hist,
-        last,
-        top1_img,
-        top1_info,
-        top2_img,
-        top2_info,
-        top3_img,
-        top3_info,
-    )
+    left_img, right_img, left_md, right_md = render_pendants(next_pendants[nL], next_pendants[nR])
+    return nL, nR, "Showing next comparison.", left_img, right_img, left_md, right_md, last
 
 
 def reset_db(folder):
@@ -402,6 +385,7 @@ def reset_db(folder):
 
     folder_abs = str(Path(folder).expanduser().resolve())
     db_path = reset_database(folder_abs)
+    invalidate_display_cache(folder_abs)
     return f"Reset DB at `{db_path}`. Now rescan the folder.", pd.DataFrame(), pd.DataFrame()
 
 
@@ -473,17 +457,17 @@ def create_ui() -> gr.Blocks:
         with gr.Row():
             with gr.Column(scale=1):
                 gr.Markdown("### 🥇 #1")
-                top1_img = gr.Image(type="pil", label="", show_label=False, height=400)
+                top1_img = gr.Image(type="filepath", label="", show_label=False, height=400)
                 top1_info = gr.Markdown("")
 
             with gr.Column(scale=1):
                 gr.Markdown("### 🥈 #2")
-                top2_img = gr.Image(type="pil", label="", show_label=False, height=400)
+                top2_img = gr.Image(type="filepath", label="", show_label=False, height=400)
                 top2_info = gr.Markdown("")
 
             with gr.Column(scale=1):
                 gr.Markdown("### 🥉 #3")
-                top3_img = gr.Image(type="pil", label="", show_label=False, height=400)
+                top3_img = gr.Image(type="filepath", label="", show_label=False, height=400)
                 top3_info = gr.Markdown("")
 
         # Helper to extract folder path
@@ -517,6 +501,18 @@ def create_ui() -> gr.Blocks:
         )
 
         # Event handlers
+        # The choice buttons share one queue slot, so decisions run one at a time
+        # in click order, and a button ignores repeat clicks while its own
+        # decision is pending. Pending decisions are not cancelled: each one is a
+        # recorded vote, and cancelling only drops its outputs, not the work.
+        # Load/Rescan and Reset take the same slot, so the folder's engine and
+        # caches are never replaced or cleared in the middle of a decision.
+        decision_queue = {
+            "concurrency_id": "decide",
+            "concurrency_limit": 1,
+            "trigger_mode": "once",
+        }
+
         load_btn.click(
             load_folder_and_first_pair,
             inputs=[selected_folder],
@@ -539,107 +535,64 @@ def create_ui() -> gr.Blocks:
                 top3_img,
                 top3_info,
             ],
+            **decision_queue,
         )
 
         reset_btn.click(
             reset_db,
             inputs=[selected_folder],
             outputs=[status_md, leaderboard, history],
+            **decision_queue,
         )
 
-        def _decide(outcome, folder, left_id, right_id):
-            return decide_and_advance(folder, left_id, right_id, outcome)
+        decision_outputs = [
+            left_id_state,
+            right_id_state,
+            status_md,
+            left_img,
+            right_img,
+            left_info,
+            right_info,
+            last_result_md,
+        ]
+        # Tables and top 3 follow in a second event, after the next pair is shown
+        stats_outputs = [
+            leaderboard,
+            history,
+            top1_img,
+            top1_info,
+            top2_img,
+            top2_info,
+            top3_img,
+            top3_info,
+        ]
 
         left_choice.click(
-            lambda folder, left_id, right_id: _decide("L", folder, left_id, right_id),
+            partial(decide_and_advance_fast, "L"),
             inputs=[folder_state, left_id_state, right_id_state],
-            outputs=[
-                left_id_state,
-                right_id_state,
-                status_md,
-                left_img,
-                right_img,
-                left_info,
-                right_info,
-                leaderboard,
-                history,
-                last_result_md,
-                top1_img,
-                top1_info,
-                top2_img,
-                top2_info,
-                top3_img,
-                top3_info,
-            ],
-        )
+            outputs=decision_outputs,
+            **decision_queue,
+        ).then(refresh_stats, inputs=[folder_state], outputs=stats_outputs)
 
         right_choice.click(
-            lambda folder, left_id, right_id: _decide("R", folder, left_id, right_id),
+            partial(decide_and_advance_fast, "R"),
             inputs=[folder_state, left_id_state, right_id_state],
-            outputs=[
-                left_id_state,
-                right_id_state,
-                status_md,
-                left_img,
-                right_img,
-                left_info,
-                right_info,
-                leaderboard,
-                history,
-                last_result_md,
-                top1_img,
-                top1_info,
-                top2_img,
-                top2_info,
-                top3_img,
-                top3_info,
-            ],
-        )
+            outputs=decision_outputs,
+            **decision_queue,
+        ).then(refresh_stats, inputs=[folder_state], outputs=stats_outputs)
 
         draw_choice.click(
-            lambda folder, left_id, right_id: _decide("D", folder, left_id, right_id),
+            partial(decide_and_advance_fast, "D"),
             inputs=[folder_state, left_id_state, right_id_state],
-            outputs=[
-                left_id_state,
-                right_id_state,
-                status_md,
-                left_img,
-                right_img,
-                left_info,
-                right_info,
-                leaderboard,
-                history,
-                last_result_md,
-                top1_img,
-                top1_info,
-                top2_img,
-                top2_info,
-                top3_img,
-                top3_info,
-            ],
-        )
+            outputs=decision_outputs,
+            **decision_queue,
+        ).then(refresh_stats, inputs=[folder_state], outputs=stats_outputs)
 
         skip_choice.click(
-            lambda folder, left_id, right_id: _decide("S", folder, left_id, right_id),
+            partial(decide_and_advance_fast, "S"),
             inputs=[folder_state, left_id_state, right_id_state],
-            outputs=[
-                left_id_state,
-                right_id_state,
-                status_md,
-                left_img,
-                right_img,
-                left_info,
-                right_info,
-                leaderboard,
-                history,
-                last_result_md,
-                top1_img,
-                top1_info,
-                top2_img,
-                top2_info,
-                top3_img,
-                top3_info,
-            ],
-        )
+            outputs=decision_outputs,
+            **decision_queue,
+        ).then(refresh_stats, inputs=[folder_state], outputs=stats_outputs)
 
     return demo
@@ -3,7 +3,12 @@
 from pathlib import Path
 import tempfile
 
-from product_picker.config import save_last_folder, load_last_folder, get_config_path
+from product_picker.config import (
+    get_config_path,
+    get_recent_folders,
+    load_last_folder,
+    save_last_folder,
+)
 
 
 def test_save_and_load_folder():
@@ -32,4 +37,20 @@ def test_config_path():
     """Test config path is in home directory."""
     config_path = get_config_path()
     assert config_path.parent.name == ".pendant_chooser"
-    assert config_path.name == "config.json"
+    assert config_path.name == "config.sqlite"
+
+
+def test_recent_folders_most_recent_first():
+    """Re-saving a folder should move it to the front of the recent list."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        first = str(Path(tmpdir) / "first")
+        second = str(Path(tmpdir) / "second")
+        Path(first).mkdir()
+        Path(second).mkdir()
+
+        save_last_folder(first)
+        save_last_folder(second)
+        save_last_folder(first)
+
+        recent = get_recent_folders()
+        assert recent.index(first) < recent.index(second)
@@ -0,0 +1,60 @@
+"""Tests for database engine setup."""
+
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlmodel import select
+
+from product_picker.database import ENGINE_CACHE, get_engine, get_session
+from product_picker.models import Pendant
+
+
+def test_connections_use_wal_with_normal_sync():
+    """Every pooled connection should run in WAL mode without an fsync per commit."""
+    with tempfile.TemporaryDirectory() as folder:
+        with get_session(folder) as session:
+            journal_mode = session.exec(text("PRAGMA journal_mode")).scalar()
+            synchronous = session.exec(text("PRAGMA synchronous")).scalar()
+
+    assert journal_mode == "wal"
+    assert synchronous == 1  # NORMAL
+
+
+def test_connections_use_memory_mapped_io_and_memory_temp_store():
+    """Reads should go through mmap and temp tables/sorts should stay in memory."""
+    with tempfile.TemporaryDirectory() as folder:
+        with get_session(folder) as session:
+            mmap_size = session.exec(text("PRAGMA mmap_size")).scalar()
+            temp_store = session.exec(text("PRAGMA temp_store")).scalar()
+            cache_size = session.exec(text("PRAGMA cache_size")).scalar()
+
+    assert mmap_size == 268435456
+    assert temp_store == 2  # MEMORY
+    assert cache_size == -65536
+
+
+def test_generated_score_column_added_to_existing_database():
+    """Databases created before Pendant.score should get the column and its index."""
+    with tempfile.TemporaryDirectory() as folder:
+        engine = get_engine(folder)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX ix_pendant_folder_score")
+            conn.exec_driver_sql("ALTER TABLE pendant DROP COLUMN score")
+        ENGINE_CACHE.pop(str(Path(folder).resolve())).dispose()
+
+        with get_session(folder) as session:
+            session.add(Pendant(folder=folder, rel_path="a.jpg", sha256="a", mu=30.0, sigma=2.0))
+            session.commit()
+            assert session.exec(select(Pendant.score)).one() == 24.0
+            plan = session.exec(
+                text(
+                    "EXPLAIN QUERY PLAN SELECT id FROM pendant "
+                    "WHERE folder = :f ORDER BY score DESC, id"
+                ),
+                params={"f": folder},
+            ).all()
+
+    details = " ".join(row[-1] for row in plan)
+    assert "INDEX ix_pendant_folder_score" in details
+    assert "TEMP B-TREE" not in details
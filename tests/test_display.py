@@ -0,0 +1,32 @@
+"""Tests for leaderboard and history tables."""
+
+import tempfile
+
+from product_picker.database import get_session
+from product_picker.display import get_leaderboard, get_match_history
+from product_picker.matching import record_match
+from product_picker.models import Pendant
+
+
+def test_tables_cached_until_a_match_commits():
+    """Tables should be reused between clicks and refreshed once a match is committed."""
+    with tempfile.TemporaryDirectory() as folder:
+        with get_session(folder) as session:
+            session.add(Pendant(folder=folder, rel_path="a.jpg", sha256="a"))
+            session.add(Pendant(folder=folder, rel_path="b.jpg", sha256="b"))
+            session.commit()
+
+        lb = get_leaderboard(folder)
+        hist = get_match_history(folder)
+        assert get_leaderboard(folder) is lb
+        assert get_match_history(folder) is hist
+
+        with get_session(folder) as session:
+            a, b = lb["id"].tolist()
+            record_match(session, folder, a, b, "L")
+            # Not committed yet: the cached tables are still current
+            assert get_match_history(folder) is hist
+            session.commit()
+
+        assert get_leaderboard(folder) is not lb
+        assert len(get_match_history(folder)) == 1
@@ -0,0 +1,72 @@
+"""Tests for image loading helpers."""
+
+import os
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+from product_picker.images import find_image_files, load_image_for_display, thumbnail_file
+from product_picker.models import Pendant
+
+
+def test_large_jpeg_downscaled_upright():
+    """Large JPEGs should come back within max_side, rotated per their EXIF orientation."""
+    with tempfile.TemporaryDirectory() as folder:
+        img = Image.new("RGB", (4000, 3000), "green")
+        exif = img.getexif()
+        exif[0x0112] = 6  # Orientation: rotate 90° clockwise to display
+        img.save(Path(folder) / "a.jpg", exif=exif.tobytes())
+        pendant = Pendant(folder=folder, rel_path="a.jpg", sha256="a")
+
+        shown = load_image_for_display(pendant, max_side=900)
+        assert shown.size == (675, 900)
+        assert shown.mode == "RGB"
+
+
+def test_thumbnail_file_encoded_once():
+    """Thumbnail files should be written on first use and reused by name afterwards."""
+    with tempfile.TemporaryDirectory() as folder:
+        Image.new("RGB", (1600, 800), "red").save(Path(folder) / "a.png")
+        pendant = Pendant(folder=folder, rel_path="a.png", sha256="abc")
+
+        thumb = thumbnail_file(pendant)
+        with Image.open(thumb) as img:
+            assert (img.format, img.size) == ("WEBP", (400, 200))
+
+        os.utime(thumb, ns=(1, 1))
+        assert thumbnail_file(pendant) == thumb
+        assert thumb.stat().st_mtime_ns == 1
+
+
+def test_palette_image_downscaled_with_antialiasing():
+    """Palette images should be averaged when downscaled, not point-sampled."""
+    with tempfile.TemporaryDirectory() as folder:
+        checker = Image.new("P", (1800, 1800))
+        checker.putpalette([0, 0, 0, 255, 255, 255])
+        checker.putdata([(x + y) % 2 for y in range(1800) for x in range(1800)])
+        checker.save(Path(folder) / "a.png")
+        pendant = Pendant(folder=folder, rel_path="a.png", sha256="a")
+
+        shown = load_image_for_display(pendant, max_side=900)
+        assert shown.mode == "RGB"
+        assert 100 < shown.getpixel((450, 450))[0] < 155
+
+
+def test_find_image_files_skips_unreadable_folders(monkeypatch):
+    """A folder that can't be listed should be skipped, not abort the whole scan."""
+    with tempfile.TemporaryDirectory() as folder:
+        root = Path(folder)
+        for sub in ("ok", "locked"):
+            (root / sub).mkdir()
+            Image.new("RGB", (4, 4)).save(root / sub / "a.png")
+
+        scandir = os.scandir
+
+        def guarded_scandir(path):
+            if isinstance(path, str) and os.path.basename(path) == "locked":
+                raise PermissionError(13, "Permission denied", str(path))
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", guarded_scandir)
+        assert find_image_files(root) == [root / "ok" / "a.png"]
@@ -0,0 +1,270 @@
+"""Tests for pair selection scoring."""
+
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pytest
+from sqlmodel import Session, select
+from trueskill import Rating
+
+import product_picker.matching as matching
+from product_picker.database import get_session
+from product_picker.matching import (
+    _DRAW_MARGIN,
+    _SEL_NEW_MATCHES,
+    _SEL_PAIR_COUNTS,
+    _SEL_RECENT_OUTCOMES,
+    _TAU_SQ,
+    _TWO_BETA_SQ,
+    _best_candidate,
+    _cached_match_stats,
+    _cached_pendants,
+    _expected_sigma_reduction,
+    _scalar_reduction_bound,
+    invalidate_pair_cache,
+    record_match,
+    record_matches,
+    update_cached_ratings,
+)
+from product_picker.models import Match, Pendant
+from product_picker.rating import TS_ENV
+
+
+def _reference_sigma_reduction(mu_l, sigma_l, mu_r, sigma_r):
+    """EΔσ computed with trueskill's own quality_1vs1()/rate_1vs1()."""
+    rL = Rating(mu=mu_l, sigma=sigma_l)
+    rR = Rating(mu=mu_r, sigma=sigma_r)
+    denom = np.sqrt(2 * TS_ENV.beta**2 + sigma_l**2 + sigma_r**2)
+    p_left_nd = TS_ENV.cdf((mu_l - mu_r) / denom)
+    p_draw = TS_ENV.quality_1vs1(rL, rR)
+
+    newL_w, newR_w = TS_ENV.rate_1vs1(rL, rR, drawn=False)
+    newR_l, newL_l = TS_ENV.rate_1vs1(rR, rL, drawn=False)
+    newL_d, newR_d = TS_ENV.rate_1vs1(rL, rR, drawn=True)
+
+    sigma_sum = sigma_l + sigma_r
+    return (
+        p_left_nd * (1 - p_draw) * (sigma_sum - newL_w.sigma - newR_w.sigma)
+        + (1 - p_left_nd) * (1 - p_draw) * (sigma_sum - newL_l.sigma - newR_l.sigma)
+        + p_draw * (sigma_sum - newL_d.sigma - newR_d.sigma)
+    )
+
+
+def test_expected_sigma_reduction_matches_trueskill():
+    """The vectorized EΔσ should agree with trueskill's own updates."""
+    mu_l = np.array([25.0, 30.0, 20.0, 27.5])
+    sigma_l = np.array([25.0 / 3.0, 4.0, 6.0, 1.5])
+    mu_r = np.array([25.0, 18.0, 22.0, 26.0])
+    sigma_r = np.array([25.0 / 3.0, 7.0, 2.0, 1.2])
+
+    got = _expected_sigma_reduction(mu_l, sigma_l, mu_r, sigma_r)
+    expected = [_reference_sigma_reduction(*args) for args in zip(mu_l, sigma_l, mu_r, sigma_r)]
+    assert got == pytest.approx(expected, abs=1e-6)
+
+
+def test_expected_sigma_reduction_prefers_uncertain_pairs():
+    """Comparing two fresh items should reduce more uncertainty than two settled ones."""
+    fresh = _expected_sigma_reduction(
+        np.array(25.0), np.array(25.0 / 3.0), np.array(25.0), np.array(25.0 / 3.0)
+    )
+    settled = _expected_sigma_reduction(
+        np.array(25.0), np.array(1.0), np.array(25.0), np.array(1.0)
+    )
+    assert fresh > settled > 0
+
+
+def test_best_candidate_matches_vectorized_argmax():
+    """The scalar (numba) search should pick the same candidate as the NumPy path."""
+    rng = np.random.default_rng(1)
+    mu = rng.uniform(15, 35, 12)
+    sigma = rng.uniform(1, 8.5, 12)
+    ia, ib = np.nonzero(np.arange(5)[:, None] < np.arange(12)[None, :])
+    repeat = rng.integers(0, 3, len(ia)).astype(np.float64)
+    blocked = rng.random(len(ia)) < 0.2
+
+    score = _expected_sigma_reduction(mu[ia], sigma[ia], mu[ib], sigma[ib]) - 0.5 * repeat
+    expected = np.argmax(np.where(blocked, -np.inf, score))
+
+    best = _best_candidate(mu, sigma, ia, ib, repeat, blocked, _TWO_BETA_SQ, _TAU_SQ, _DRAW_MARGIN)
+    assert best == expected
+
+
+def test_reduction_bound_is_an_upper_bound():
+    """The pruning bound must never be below the EΔσ it stands in for."""
+    rng = np.random.default_rng(2)
+    mu_l, mu_r = rng.uniform(0, 50, (2, 500))
+    sigma_l, sigma_r = rng.uniform(0.05, 9, (2, 500))
+
+    reduction = _expected_sigma_reduction(mu_l, sigma_l, mu_r, sigma_r)
+    bound = np.array(
+        [_scalar_reduction_bound(sl, sr, _TWO_BETA_SQ, _TAU_SQ) for sl, sr in zip(sigma_l, sigma_r)]
+    )
+    assert np.all(reduction <= bound)
+
+
+def test_match_stats_pick_up_new_matches():
+    """Cached repeat counts and cooldown pairs should include matches recorded later."""
+    with tempfile.TemporaryDirectory() as folder:
+        with get_session(folder) as session:
+            for name in "abc":
+                session.add(Pendant(folder=folder, rel_path=f"{name}.jpg", sha256=name))
+            session.commit()
+            a, b, c = (p.id for p in session.exec(select(Pendant).order_by(Pendant.id)).all())
+
+            record_match(session, folder, b, a, "L")
+            session.commit()
+            assert _cached_match_stats(session, folder) == ({(a, b): 1}, set())
+
+            record_match(session, folder, a, b, "S")
+            session.commit()
+            assert _cached_match_stats(session, folder) == ({(a, b): 2}, {(a, b)})
+
+            # The skip stays on cooldown for COOLDOWN_MATCHES matches
+            record_match(session, folder, c, a, "R")
+            record_match(session, folder, b, c, "L")
+            session.commit()
+            counts, cooldown = _cached_match_stats(session, folder)
+            assert counts == {(a, b): 2, (a, c): 1, (b, c): 1}
+            assert cooldown == set()
+
+
+def _query_plan(session, statement, **params) -> str:
+    """SQLite's EXPLAIN QUERY PLAN for a statement, as one string."""
+    compiled = statement.compile(session.get_bind())
+    values = compiled.construct_params(params)
+    args = tuple(values[name] for name in compiled.positiontup)
+    plan = session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), args)
+    return " ".join(row[-1] for row in plan.all())
+
+
+@pytest.mark.parametrize(
+    "statement, params, index",
+    [
+        (_SEL_PAIR_COUNTS, {"since_id": 0}, "COVERING INDEX ix_match_folder_pair"),
+        # Ordering by id walks ix_match_folder, which carries the rowid
+        (_SEL_RECENT_OUTCOMES, {"last_n": 2}, "INDEX ix_match_folder"),
+        (_SEL_NEW_MATCHES, {"since_id": 0}, "INDEX ix_match_folder"),
+    ],
+)
+def test_match_queries_use_index_without_sorting(statement, params, index):
+    """Per-click match queries should be answered from an index, without a sort."""
+    with tempfile.TemporaryDirectory() as folder:
+        with get_session(folder) as session:
+            details = _query_plan(session, statement, folder=folder, **params)
+
+    assert index in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_cached_ratings_updated_in_place():
+    """Updated ratings should reach the cached arrays without a reload."""
+    with tempfile.TemporaryDirectory() as folder:
+        with get_session(folder) as session:
+            session.add(Pendant(folder=folder, rel_path="a.jpg", sha256="a"))
+            session.add(Pendant(folder=folder, rel_path="b.jpg", sha256="b"))
+            session.commit()
+
+            cached = _cached_pendants(session, folder)
+            a = session.exec(select(Pendant).where(Pendant.rel_path == "a.jpg")).one()
+            a.mu, a.sigma, a.games = 30.0, 5.0, 1
+            update_cached_ratings(folder, [a])
+
+            assert _cached_pendants(session, folder) is cached
+            i = cached["pos"][a.id]
+            assert (cached["mu"][i], cached["sigma"][i], cached["games"][i]) == (30.0, 5.0, 1)
+
+
+def test_added_pendants_appended_to_cache():
+    """Pendants added after the first load should be appended, keeping cached ratings."""
+    with tempfile.TemporaryDirectory() as folder:
+        with get_session(folder) as session:
+            session.add(Pendant(folder=folder, rel_path="a.jpg", sha256="a", mu=30.0))
+            session.commit()
+            _cached_pendants(session, folder)
+
+            session.add(Pendant(folder=folder, rel_path="b.jpg", sha256="b"))
+            session.commit()
+            assert len(_cached_pendants(session, folder)["ids"]) == 1
+
+            invalidate_pair_cache(folder)
+            cached = _cached_pendants(session, folder)
+            b = session.exec(select(Pendant).where(Pendant.rel_path == "b.jpg")).one()
+            assert cached["ids"].tolist()[cached["pos"][b.id]] == b.id
+            assert cached["mu"].tolist() == [30.0, 25.0]
+
+
+def test_choice_reused_until_state_changes(monkeypatch):
+    """Asking again without new matches or ratings should not redo the selection."""
+    with tempfile.TemporaryDirectory() as folder:
+        with get_session(folder) as session:
+            for name in "abcd":
+                session.add(Pendant(folder=folder, rel_path=f"{name}.jpg", sha256=name, games=1))
+            session.commit()
+
+        calls = []
+        select_pair = matching._select_pair
+        monkeypatch.setattr(
+            matching, "_select_pair", lambda *args: calls.append(1) or select_pair(*args)
+        )
+
+        first = matching.choose_next_pair(folder)
+        assert matching.choose_next_pair(folder) == first
+        assert len(calls) == 1
+
+        with get_session(folder) as session:
+            record_match(session, folder, first[0], first[1], "S")
+            session.commit()
+        matching.choose_next_pair(folder)
+        assert len(calls) == 2
+
+
+def test_record_matches_inserts_canonical_pairs():
+    """Batch-recorded matches should be stored like individually recorded ones."""
+    with tempfile.TemporaryDirectory() as folder:
+        with get_session(folder) as session:
+            record_matches(session, folder, [(2, 1, "L"), (1, 3, "D")])
+            session.commit()
+
+            matches = session.exec(select(Match).order_by(Match.id)).all()
+            assert [(m.shown_left_id, m.shown_right_id, m.outcome) for m in matches] == [
+                (2, 1, "L"),
+                (1, 3, "D"),
+            ]
+            assert [(m.pair_a_id, m.pair_b_id) for m in matches] == [(1, 2), (1, 3)]
+            assert all(m.created_at_utc for m in matches)
+
+
+def test_match_stats_fold_each_match_once_across_threads(monkeypatch):
+    """Concurrent callers must not both fold in the same new matches."""
+    with tempfile.TemporaryDirectory() as folder:
+        with get_session(folder) as session:
+            record_match(session, folder, 1, 2, "L")
+            session.commit()
+            _cached_match_stats(session, folder)
+            record_match(session, folder, 1, 2, "S")
+            session.commit()
+
+        exec_ = Session.exec
+
+        def slow_exec(self, statement, *args, **kwargs):
+            if statement is _SEL_NEW_MATCHES:
+                time.sleep(0.05)  # widen the read-then-fold window
+            return exec_(self, statement, *args, **kwargs)
+
+        monkeypatch.setattr(Session, "exec", slow_exec)
+
+        def read_stats():
+            with get_session(folder) as session:
+                _cached_match_stats(session, folder)
+
+        threads = [threading.Thread(target=read_stats) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        monkeypatch.undo()
+        with get_session(folder) as session:
+            assert _cached_match_stats(session, folder) == ({(1, 2): 2}, {(1, 2)})
@@ -3,7 +3,8 @@
 import pytest
 from pathlib import Path
 
-from product_picker.rating import conservative_score
+from product_picker.models import Pendant
+from product_picker.rating import TS_ENV, conservative_score, update_ratings
 
 
 def test_conservative_score():
@@ -20,3 +21,24 @@ def test_conservative_score_lowers_uncertainty():
     low_uncertainty = conservative_score(mu, 5.0)
     high_uncertainty = conservative_score(mu, 10.0)
     assert low_uncertainty > high_uncertainty
+
+
+@pytest.mark.parametrize("outcome", ["L", "R", "D"])
+@pytest.mark.parametrize(
+    "mu_l, sigma_l, mu_r, sigma_r", [(25.0, 25.0 / 3.0, 25.0, 25.0 / 3.0), (31.0, 2.5, 22.0, 6.0)]
+)
+def test_update_ratings_matches_trueskill(outcome, mu_l, sigma_l, mu_r, sigma_r):
+    """The inline 1v1 update should agree with trueskill's rate_1vs1()."""
+    left = Pendant(folder="f", rel_path="l.jpg", sha256="l", mu=mu_l, sigma=sigma_l)
+    right = Pendant(folder="f", rel_path="r.jpg", sha256="r", mu=mu_r, sigma=sigma_r)
+    update_ratings(left, right, outcome)
+
+    rL, rR = TS_ENV.Rating(mu=mu_l, sigma=sigma_l), TS_ENV.Rating(mu=mu_r, sigma=sigma_r)
+    if outcome == "R":
+        newR, newL = TS_ENV.rate_1vs1(rR, rL)
+    else:
+        newL, newR = TS_ENV.rate_1vs1(rL, rR, drawn=outcome == "D")
+
+    got = [left.mu, left.sigma, right.mu, right.sigma]
+    assert got == pytest.approx([newL.mu, newL.sigma, newR.mu, newR.sigma], abs=1e-4)
+    assert (left.games, right.games) == (1, 1)
@@ -0,0 +1,43 @@
+"""Tests for folder scanning."""
+
+import os
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+from sqlmodel import select
+
+import product_picker.scanner as scanner
+from product_picker.database import get_session
+from product_picker.models import Pendant
+
+
+def _make_images(folder: Path, count: int) -> None:
+    for i in range(count):
+        Image.new("RGB", (8, 8), (i * 20, 0, 0)).save(folder / f"{i}.png")
+
+
+def test_rescan_skips_hashing_unchanged_files(monkeypatch):
+    """Files whose size and mtime match the stored stats should not be hashed again."""
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp).resolve()
+        _make_images(folder, 3)
+        assert scanner.scan_folder(str(folder))["added"] == 3
+
+        hashed = []
+        sha256_file = scanner.sha256_file
+        monkeypatch.setattr(scanner, "sha256_file", lambda p: hashed.append(p) or sha256_file(p))
+
+        assert scanner.scan_folder(str(folder)) == {"found": 3, "added": 0, "skipped": 3}
+        assert hashed == []
+
+        # A touched file is re-hashed once, then skipped again
+        os.utime(folder / "0.png", ns=(1, 1))
+        assert scanner.scan_folder(str(folder))["added"] == 0
+        assert [p.name for p in hashed] == ["0.png"]
+        scanner.scan_folder(str(folder))
+        assert len(hashed) == 1
+
+        with get_session(str(folder)) as session:
+            pendant = session.exec(select(Pendant).where(Pendant.rel_path == "0.png")).one()
+            assert pendant.file_mtime_ns == 1
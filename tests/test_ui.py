@@ -0,0 +1,41 @@
+"""Tests for the click handlers."""
+
+import tempfile
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select
+
+from product_picker.database import get_session
+from product_picker.matching import _cached_pendants
+from product_picker.models import Pendant
+from product_picker.ui import decide_and_advance_fast
+
+
+def test_failed_commit_leaves_cached_ratings_unchanged():
+    """Ratings from a rolled-back click must not reach the pair-selection cache."""
+    with tempfile.TemporaryDirectory() as folder:
+        with get_session(folder) as session:
+            session.add(Pendant(folder=folder, rel_path="a.jpg", sha256="a"))
+            session.add(Pendant(folder=folder, rel_path="b.jpg", sha256="b"))
+            session.commit()
+            a, b = session.exec(select(Pendant.id).order_by(Pendant.id)).all()
+            cached = _cached_pendants(session, folder)
+            before = (cached["mu"].copy(), cached["sigma"].copy(), cached["games"].copy())
+
+        def locked(session):
+            raise OperationalError("COMMIT", {}, Exception("database is locked"))
+
+        event.listen(Session, "before_commit", locked)
+        try:
+            with pytest.raises(OperationalError):
+                decide_and_advance_fast("L", folder, a, b)
+        finally:
+            event.remove(Session, "before_commit", locked)
+
+        with get_session(folder) as session:
+            assert _cached_pendants(session, folder) is cached
+            assert session.exec(select(Pendant.games)).all() == [0, 0]
+        after = (cached["mu"], cached["sigma"], cached["games"])
+        assert all((x == y).all() for x, y in zip(before, after))